@@ -4,27 +4,55 @@ App Reviewer AI - App Store Adapter
 Fetches reviews from the iOS App Store.
 """
 
-import httpx
+import asyncio
+import math
+import orjson
+from itertools import chain, islice
 from typing import List, Optional
 from datetime import datetime
 import logging
-import xml.etree.ElementTree as ET
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.adapters.base import BaseAdapter
-from app.api.schemas import Review
+from app.api.schemas import Review, utc_now
+from app.core.cache import async_method_ttl_cache
+from app.core.retry import with_backoff
 
 logger = logging.getLogger(__name__)
 
+# Valid star rating labels in the RSS feed
+_RATINGS = {str(stars): stars for stars in range(1, 6)}
+
+
+def _label(entry: dict, key: str) -> Optional[str]:
+    """Read the 'label' of an RSS JSON node without allocating a default dict."""
+    node = entry.get(key)
+    return node.get("label") if node else None
+
+
+def _parse_date(value: Optional[str]) -> datetime:
+    """Parse an RSS timestamp (e.g. '2024-01-31T08:15:00-07:00'), falling back to now."""
+    if not value:
+        return utc_now()
+    
+    # fromisoformat only accepts a trailing 'Z' from Python 3.11
+    if value[-1] == "Z":
+        value = value[:-1] + "+00:00"
+    
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return utc_now()
+
 
 class AppStoreAdapter(BaseAdapter):
     """iOS App Store review adapter using RSS feed."""
     
-    # RSS feed URL template (JSON for structured parsing)
-    RSS_URL = "https://itunes.apple.com/{country}/rss/customerreviews/id={app_id}/sortBy=mostRecent/page={page}/json"
+    # Pagination limits of the RSS feed
+    MAX_PAGES = 10
+    REVIEWS_PER_PAGE = 50
     
-    # Lookup API for validation
-    LOOKUP_URL = "https://itunes.apple.com/lookup?id={app_id}&country={country}"
+    # Validation results are cached in-process for this long (seconds)
+    VALIDATION_CACHE_TTL = 3600
     
     # Expanded Country code mapping from locale
     LOCALE_TO_COUNTRY = {
@@ -47,44 +75,39 @@ class AppStoreAdapter(BaseAdapter):
     
     def _get_country(self, locale: str) -> str:
         """Convert locale to country code with fallback to extraction."""
-        if locale in self.LOCALE_TO_COUNTRY:
-            return self.LOCALE_TO_COUNTRY[locale]
+        country = self.LOCALE_TO_COUNTRY.get(locale)
+        if country is not None:
+            return country
             
         # Try to extract country from locale format (e.g., 'en-US' -> 'us', 'tr-TR' -> 'tr')
-        if "-" in locale:
-            return locale.split("-")[-1].lower()
-        
-        return "us"
+        _, sep, tail = locale.rpartition("-")
+        return tail.lower() if sep else "us"
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
     async def _fetch_page(
         self,
         app_id: str,
         country: str,
-        page: int
+        page: int,
+        locale: str
     ) -> List[Review]:
         """Fetch a single page of reviews."""
-        url = self.RSS_URL.format(
-            country=country,
-            app_id=app_id,
-            page=page
+        # RSS feed URL (JSON for structured parsing)
+        url = (
+            f"https://itunes.apple.com/{country}/rss/customerreviews"
+            f"/id={app_id}/sortBy=mostRecent/page={page}/json"
         )
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url)
-            
-            # If 404, it might mean no more pages or invalid app/region combination
-            if response.status_code == 404:
-                return []
-                
-            response.raise_for_status()
+        response = await self.client.get(url)
+        
+        # If 404, it might mean no more pages or invalid app/region combination
+        if response.status_code == 404:
+            return []
             
-            return self._parse_json(response.json())
+        response.raise_for_status()
+        
+        return self._parse_json(orjson.loads(response.content), locale)
     
-    def _parse_json(self, data: dict) -> List[Review]:
+    def _parse_json(self, data: dict, locale: str) -> List[Review]:
         """Parse RSS JSON into Review objects."""
         reviews = []
         
@@ -103,37 +126,28 @@ class AppStoreAdapter(BaseAdapter):
                 if "im:rating" not in entry:
                     continue
                 
-                try:
-                    review_id = entry.get("id", {}).get("label")
-                    title = entry.get("title", {}).get("label")
-                    content = entry.get("content", {}).get("label")
-                    rating = entry.get("im:rating", {}).get("label")
-                    updated = entry.get("updated", {}).get("label")
-                    
-                    if not content:
-                        continue
-                    
-                    # Parse date
-                    try:
-                        review_date = datetime.fromisoformat(
-                            updated.replace("Z", "+00:00")
-                        ) if updated else datetime.utcnow()
-                    except:
-                        review_date = datetime.utcnow()
-                    
-                    review = Review(
-                        review_id=review_id if review_id else f"unknown_{len(reviews)}",
-                        rating=int(rating) if rating else 3,
-                        date=review_date,
-                        locale="en-US",  # Will be set by caller
-                        title=title if title else None,
-                        body=content
-                    )
-                    
-                    reviews.append(review)
-                except Exception as e:
-                    logger.warning(f"Failed to parse review entry: {e}")
+                content = _label(entry, "content")
+                if not content:
+                    continue
+                
+                # Validate the rating up front so the happy path never raises
+                rating_label = _label(entry, "im:rating")
+                rating = _RATINGS.get(rating_label) if rating_label else 3
+                if rating is None:
+                    logger.warning(f"Skipping review entry with invalid rating: {rating_label!r}")
                     continue
+                
+                review_id = _label(entry, "id")
+                title = _label(entry, "title")
+                
+                reviews.append(Review(
+                    review_id=review_id if review_id else f"unknown_{len(reviews)}",
+                    rating=rating,
+                    date=_parse_date(_label(entry, "updated")),
+                    locale=locale,
+                    title=title if title else None,
+                    body=content
+                ))
                     
         except Exception as e:
             logger.error(f"Failed to parse RSS JSON: {e}")
@@ -148,54 +162,59 @@ class AppStoreAdapter(BaseAdapter):
     ) -> List[Review]:
         """Fetch reviews from App Store RSS feed."""
         country = self._get_country(locale)
-        all_reviews: List[Review] = []
-        page = 1
-        max_pages = 10  # RSS feed has max 10 pages
+        pages: List[List[Review]] = []
+        
+        # Only request as many pages as the limit can use (RSS feed has max 10 pages)
+        max_pages = min(self.MAX_PAGES, math.ceil(limit / self.REVIEWS_PER_PAGE))
         
         logger.info(f"Fetching reviews for app {app_id} ({locale})")
         
-        while len(all_reviews) < limit and page <= max_pages:
-            try:
-                page_reviews = await self._fetch_page(app_id, country, page)
-                
-                if not page_reviews:
-                    break
-                
-                # Set locale for all reviews
-                for review in page_reviews:
-                    review.locale = locale
-                
-                all_reviews.extend(page_reviews)
-                page += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to fetch page {page}: {e}")
+        # Pages are independent, so fetch them concurrently
+        results = await asyncio.gather(
+            *(
+                with_backoff(self._fetch_page, app_id, country, page, locale)
+                for page in range(1, max_pages + 1)
+            ),
+            return_exceptions=True
+        )
+        
+        for page, page_reviews in enumerate(results, 1):
+            if isinstance(page_reviews, Exception):
+                logger.error(f"Failed to fetch page {page}: {page_reviews}")
                 if page == 1:
                     # First page failed, no reviews available
                     return []
                 break
+            
+            # Stop at the first empty page (end of feed)
+            if not page_reviews:
+                break
+            
+            pages.append(page_reviews)
         
-        # Trim to limit
-        all_reviews = all_reviews[:limit]
+        # Concatenate pages up to the limit in a single pass
+        all_reviews = list(islice(chain.from_iterable(pages), limit))
         
         logger.info(f"Fetched {len(all_reviews)} reviews for app {app_id}")
         return all_reviews
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
+    async def _lookup(self, url: str) -> dict:
+        """Call the lookup API and return its JSON payload."""
+        response = await self.client.get(url, timeout=10.0)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    @async_method_ttl_cache(ttl=VALIDATION_CACHE_TTL)
+    async def _app_exists(self, app_id: str) -> bool:
+        """Check the lookup API for the app (raises on network failure)."""
+        url = f"https://itunes.apple.com/lookup?id={app_id}&country=us"
+        data = await with_backoff(self._lookup, url)
+        return data.get("resultCount", 0) > 0
+    
     async def validate_app_id(self, app_id: str) -> bool:
         """Validate app ID exists in App Store."""
-        url = self.LOOKUP_URL.format(app_id=app_id, country="us")
-        
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                data = response.json()
-                return data.get("resultCount", 0) > 0
+            return await self._app_exists(app_id)
                 
         except Exception as e:
             logger.error(f"Failed to validate app ID {app_id}: {e}")
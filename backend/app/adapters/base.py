@@ -5,13 +5,28 @@ Abstract base class for review source adapters.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import httpx
+
 from app.api.schemas import Review
+from app.core.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
 
 
 class BaseAdapter(ABC):
     """Abstract base adapter for fetching reviews."""
     
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._client = client
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client (injected, or the shared pooled client)."""
+        return self._client if self._client is not None else get_http_client()
+    
     @property
     @abstractmethod
     def platform(self) -> str:
@@ -38,6 +53,44 @@ class BaseAdapter(ABC):
         """
         pass
     
+    async def fetch_reviews_batch(
+        self,
+        app_ids: List[str],
+        locale: str = "en-US",
+        limit: int = 500,
+        max_concurrency: int = 10
+    ) -> Dict[str, List[Review]]:
+        """
+        Fetch reviews for several apps concurrently over the shared connection pool.
+        
+        Args:
+            app_ids: App identifiers
+            locale: Locale code (e.g., 'en-US')
+            limit: Maximum number of reviews per app
+            max_concurrency: Maximum number of apps fetched at once
+            
+        Returns:
+            Mapping of app ID to its reviews (empty list if the fetch failed)
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch_one(app_id: str) -> List[Review]:
+            async with semaphore:
+                return await self.fetch_reviews(app_id, locale=locale, limit=limit)
+        
+        results = await asyncio.gather(
+            *(fetch_one(app_id) for app_id in app_ids),
+            return_exceptions=True
+        )
+        
+        batch: Dict[str, List[Review]] = {}
+        for app_id, result in zip(app_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to fetch reviews for {app_id}: {result}")
+                result = []
+            batch[app_id] = result
+        return batch
+    
     @abstractmethod
     async def validate_app_id(self, app_id: str) -> bool:
         """
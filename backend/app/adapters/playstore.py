@@ -9,10 +9,11 @@ from typing import List, Optional
 from datetime import datetime
 import logging
 import re
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.adapters.base import BaseAdapter
 from app.api.schemas import Review
+from app.core.cache import async_method_ttl_cache
+from app.core.retry import with_backoff
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +21,8 @@ logger = logging.getLogger(__name__)
 class PlayStoreAdapter(BaseAdapter):
     """Google Play Store review adapter using web scraping."""
     
-    # Play Store review page
-    REVIEWS_URL = "https://play.google.com/store/apps/details?id={app_id}&hl={lang}&gl={country}"
+    # Validation results are cached in-process for this long (seconds)
+    VALIDATION_CACHE_TTL = 3600
     
     @property
     def platform(self) -> str:
@@ -29,15 +30,16 @@ class PlayStoreAdapter(BaseAdapter):
     
     def _get_lang_country(self, locale: str) -> tuple:
         """Convert locale to language and country code."""
-        parts = locale.split("-")
-        lang = parts[0]
-        country = parts[1].lower() if len(parts) > 1 else "us"
+        lang, _, tail = locale.partition("-")
+        country = tail.partition("-")[0].lower() or "us"
         return lang, country
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        """GET a Play Store page, raising on non-success status."""
+        response = await self.client.get(url, **kwargs)
+        response.raise_for_status()
+        return response
+    
     async def fetch_reviews(
         self,
         app_id: str,
@@ -61,57 +63,47 @@ class PlayStoreAdapter(BaseAdapter):
         # or use a service like SerpApi, RapidAPI, etc.
         
         try:
-            url = self.REVIEWS_URL.format(
-                app_id=app_id,
-                lang=lang,
-                country=country
-            )
+            # Play Store review page
+            url = f"https://play.google.com/store/apps/details?id={app_id}&hl={lang}&gl={country}"
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                    }
-                )
-                response.raise_for_status()
-                
-                # Basic parsing - in production use proper HTML parser
-                # This is intentionally limited as full scraping requires
-                # browser automation
-                
-                logger.warning(
-                    "Play Store adapter requires enhanced implementation. "
-                    "Consider using a review API service."
-                )
+            await with_backoff(self._get, url)
+            
+            # Basic parsing - in production use proper HTML parser
+            # This is intentionally limited as full scraping requires
+            # browser automation
+            
+            logger.warning(
+                "Play Store adapter requires enhanced implementation. "
+                "Consider using a review API service."
+            )
                 
         except Exception as e:
             logger.error(f"Failed to fetch Play Store reviews: {e}")
         
         return reviews
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
+    @async_method_ttl_cache(ttl=VALIDATION_CACHE_TTL)
+    async def _app_exists(self, app_id: str) -> bool:
+        """
+        Check the app's store page.
+        
+        Only a 404 is a definitive "no"; other failures (5xx, 429, network)
+        raise, so the cache never holds a transient error as a verdict.
+        """
+        url = f"https://play.google.com/store/apps/details?id={app_id}&hl=en&gl=us"
+        
+        try:
+            await with_backoff(self._get, url, timeout=10.0)
+            return True
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return False
+            raise
+    
     async def validate_app_id(self, app_id: str) -> bool:
         """Validate app ID exists in Play Store."""
-        url = self.REVIEWS_URL.format(
-            app_id=app_id,
-            lang="en",
-            country="us"
-        )
-        
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                    }
-                )
-                return response.status_code == 200
-                
+            return await self._app_exists(app_id)
         except Exception as e:
             logger.error(f"Failed to validate app ID {app_id}: {e}")
             return False
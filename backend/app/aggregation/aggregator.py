@@ -5,24 +5,44 @@ Merges all pipeline outputs into a unified insight object.
 """
 
 from typing import List, Dict, Any
-from datetime import datetime
 import logging
 
 from app.api.schemas import (
     InsightResult, SentimentBreakdown, TopIssue, FeatureRequest,
-    MonetizationRisk, RecommendedAction, Platform, Severity, Priority
+    MonetizationRisk, RecommendedAction, Platform, Severity, Priority, utc_now
 )
 
 logger = logging.getLogger(__name__)
 
+# Valid enum values, for membership checks instead of try/except on construction
+_SEVERITY_VALUES = frozenset(s.value for s in Severity)
+_PRIORITY_VALUES = frozenset(p.value for p in Priority)
+
+
+def _to_severity(value: str) -> Severity:
+    """Map a raw severity/confidence string to Severity (default MEDIUM)."""
+    value = value.lower()
+    return Severity(value) if value in _SEVERITY_VALUES else Severity.MEDIUM
+
+
+def _to_priority(value: str) -> Priority:
+    """Map a raw priority string to Priority ("critical" -> HIGH, default MEDIUM)."""
+    value = value.lower()
+    if value == "critical":
+        return Priority.HIGH
+    return Priority(value) if value in _PRIORITY_VALUES else Priority.MEDIUM
+
 
 class InsightAggregator:
     """
     Aggregates outputs from all AI pipelines into a final insight object.
     
     Applies deterministic conflict resolution using frequency and severity weighting.
+    The aggregator is stateless; its builders are static methods.
     """
     
+    __slots__ = ()
+    
     def aggregate(
         self,
         app_id: str,
@@ -55,22 +75,22 @@ class InsightAggregator:
         logger.info(f"Aggregating results for app {app_id}")
         
         # Build sentiment breakdown
-        sentiment_breakdown = self._build_sentiment_breakdown(sentiment)
+        sentiment_breakdown = InsightAggregator._build_sentiment_breakdown(sentiment)
         
         # Build top issues
-        top_issues = self._build_top_issues(issues)
+        top_issues = InsightAggregator._build_top_issues(issues)
         
         # Build feature requests
-        feature_requests = self._build_feature_requests(features)
+        feature_requests = InsightAggregator._build_feature_requests(features)
         
         # Build monetization risks
-        monetization_risks = self._build_monetization_risks(monetization)
+        monetization_risks = InsightAggregator._build_monetization_risks(monetization)
         
         # Build recommended actions
-        recommended_actions = self._build_recommended_actions(actions)
+        recommended_actions = InsightAggregator._build_recommended_actions(actions)
         
         # Generate executive summary
-        summary = self._generate_summary(
+        summary = InsightAggregator._generate_summary(
             reviews_analyzed=reviews_analyzed,
             sentiment=sentiment,
             issues_count=len(top_issues),
@@ -89,10 +109,24 @@ class InsightAggregator:
             platform=platform,
             reviews_analyzed=reviews_analyzed,
             analysis_version=analysis_version,
-            generated_at=datetime.utcnow()
+            generated_at=utc_now()
         )
     
-    def _build_sentiment_breakdown(self, sentiment: Dict[str, Any]) -> SentimentBreakdown:
+    def aggregate_many(self, inputs: List[Dict[str, Any]]) -> List[InsightResult]:
+        """
+        Aggregate pipeline results for several apps in one call.
+        
+        Args:
+            inputs: One dict per app, holding the keyword arguments of aggregate()
+            
+        Returns:
+            InsightResult objects in input order
+        """
+        aggregate = self.aggregate
+        return [aggregate(**item) for item in inputs]
+    
+    @staticmethod
+    def _build_sentiment_breakdown(sentiment: Dict[str, Any]) -> SentimentBreakdown:
         """Build sentiment breakdown from pipeline output."""
         breakdown = sentiment.get("sentiment_breakdown", {})
         
@@ -113,81 +147,56 @@ class InsightAggregator:
             negative=negative
         )
     
-    def _build_top_issues(self, issues: List[Dict[str, Any]]) -> List[TopIssue]:
+    @staticmethod
+    def _build_top_issues(issues: List[Dict[str, Any]]) -> List[TopIssue]:
         """Build top issues list with proper schema."""
-        result = []
-        
-        for issue in issues[:10]:  # Top 10
-            severity_str = issue.get("severity", "medium").lower()
-            try:
-                severity = Severity(severity_str)
-            except ValueError:
-                severity = Severity.MEDIUM
-            
-            result.append(TopIssue(
+        return [
+            TopIssue(
                 issue=issue.get("issue", "Unknown issue"),
                 frequency=issue.get("frequency", 1),
-                severity=severity
-            ))
-        
-        return result
+                severity=_to_severity(issue.get("severity", "medium"))
+            )
+            for issue in issues[:10]  # Top 10
+        ]
     
-    def _build_feature_requests(self, features: List[Dict[str, Any]]) -> List[FeatureRequest]:
+    @staticmethod
+    def _build_feature_requests(features: List[Dict[str, Any]]) -> List[FeatureRequest]:
         """Build feature requests list."""
-        result = []
-        
-        for feature in features[:10]:  # Top 10
-            result.append(FeatureRequest(
+        return [
+            FeatureRequest(
                 feature=feature.get("feature", "Unknown feature"),
                 count=feature.get("count", 1)
-            ))
-        
-        return result
+            )
+            for feature in features[:10]  # Top 10
+        ]
     
-    def _build_monetization_risks(self, monetization: Dict[str, Any]) -> List[MonetizationRisk]:
+    @staticmethod
+    def _build_monetization_risks(monetization: Dict[str, Any]) -> List[MonetizationRisk]:
         """Build monetization risks list."""
-        result = []
         risks = monetization.get("risks", []) if monetization else []
         
-        for risk in risks[:5]:  # Top 5
-            confidence_str = risk.get("confidence", "medium").lower()
-            try:
-                confidence = Severity(confidence_str)
-            except ValueError:
-                confidence = Severity.MEDIUM
-            
-            result.append(MonetizationRisk(
+        return [
+            MonetizationRisk(
                 risk=risk.get("risk", "Unknown risk"),
-                confidence=confidence
-            ))
-        
-        return result
+                confidence=_to_severity(risk.get("confidence", "medium"))
+            )
+            for risk in risks[:5]  # Top 5
+        ]
     
-    def _build_recommended_actions(self, actions: List[Dict[str, Any]]) -> List[RecommendedAction]:
+    @staticmethod
+    def _build_recommended_actions(actions: List[Dict[str, Any]]) -> List[RecommendedAction]:
         """Build recommended actions list."""
-        result = []
-        
-        for action in actions[:10]:  # Top 10
-            priority_str = action.get("priority", "medium").lower()
-            # Map "critical" to "high"
-            if priority_str == "critical":
-                priority_str = "high"
-            
-            try:
-                priority = Priority(priority_str)
-            except ValueError:
-                priority = Priority.MEDIUM
-            
-            result.append(RecommendedAction(
+        return [
+            RecommendedAction(
                 action=action.get("action", "Unknown action"),
-                priority=priority,
+                priority=_to_priority(action.get("priority", "medium")),
                 expected_impact=action.get("expected_impact", "")
-            ))
-        
-        return result
+            )
+            for action in actions[:10]  # Top 10
+        ]
     
+    @staticmethod
     def _generate_summary(
-        self,
         reviews_analyzed: int,
         sentiment: Dict[str, Any],
         issues_count: int,
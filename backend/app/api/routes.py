@@ -5,96 +5,200 @@ FastAPI route handlers for all endpoints.
 """
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from fastapi.responses import StreamingResponse, JSONResponse
-from typing import Optional
+from fastapi.responses import Response, StreamingResponse, JSONResponse
+from typing import Optional, List
+import asyncio
 import hashlib
-import uuid
-import io
-import json
+import orjson
 import os
+import re
+import secrets
+import time
 from pathlib import Path
 
 from app.api.schemas import (
     AnalyzeRequest, AnalyzeResponse, StatusResponse, ResultResponse,
-    ErrorResponse, JobStatus, ErrorCode, Platform
+    ErrorResponse, JobStatus, ErrorCode, Platform, Review, JobData
 )
+from app.core.cache import get_cache_manager
+from app.core.http_client import get_http_client
 from app.core.job_manager import JobManager, get_job_manager
-from app.core.worker import process_job
-from app.services.pdf_generator import generate_pdf_report
+from app.core.worker import process_job, process_jobs
+from app.services.pdf_generator import render_pdf_report
 from app.services.review_fetcher import ReviewFetcher
 from app.config import get_settings
 
 router = APIRouter()
 
+# App ID pattern, compiled once at import. Handles:
+#   iOS:     /id389801252, /id/389801252, ?id=389801252
+#   Android: ?id=com.example.app
+_APP_ID_PATTERN = re.compile(r"/id/?(?P<path_id>\d+)|[?&]id=(?P<query_id>[^&]+)")
+
+# Characters stripped from app names used in filenames
+_UNSAFE_NAME_CHARS = re.compile(r'[^\w\s-]')
+
+# Maximum number of requests accepted by /analyze/batch
+_MAX_BATCH_SIZE = 50
+
 
 def generate_request_hash(request: AnalyzeRequest) -> str:
-    """Generate deterministic hash for request caching."""
+    """
+    Generate deterministic hash for request caching.
+    
+    Only used to partition the cache, not for security; BLAKE2b with a
+    16-byte digest is cheaper than SHA-256 on short inputs and still
+    yields a 32-character hex key.
+    """
     data = f"{request.app_url}|{request.options.review_limit}|{request.options.locale}|{request.options.analysis_version}"
-    return hashlib.sha256(data.encode()).hexdigest()[:32]
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def generate_analysis_id() -> str:
+    """
+    Generate a time-ordered analysis ID.
+    
+    32 hex characters: a nanosecond timestamp followed by 64 random bits.
+    IDs sort by creation time, so job keys created together share a prefix.
+    """
+    return f"{time.time_ns():016x}{secrets.randbits(64):016x}"
+
+
+def error_detail(
+    error: str,
+    error_code: ErrorCode = ErrorCode.INVALID_INPUT,
+    details: Optional[str] = None
+) -> dict:
+    """Build an HTTPException detail in the ErrorResponse shape without a model round trip."""
+    return {"error": error, "error_code": error_code.value, "details": details}
+
+
+def review_to_dict(review: Review) -> dict:
+    """
+    Plain dict for a review, for bulk JSON output.
+    
+    Cheaper than model_dump for large lists; orjson serialises the
+    datetime itself.
+    """
+    return {
+        "review_id": review.review_id,
+        "rating": review.rating,
+        "date": review.date,
+        "locale": review.locale,
+        "title": review.title,
+        "body": review.body,
+        "body_cleaned": review.body_cleaned,
+        "detected_language": review.detected_language,
+    }
+
+
+def write_reviews_file(filepath: Path, meta: dict, reviews: List[Review]) -> None:
+    """
+    Write reviews as indented JSON, one review at a time.
+    
+    Only one serialised review is held in memory at once, so the peak does
+    not grow with the review count. Output is `meta` plus a "reviews" array.
+    """
+    with open(filepath, "wb") as f:
+        # Indented meta object without its closing "\n}"
+        f.write(orjson.dumps(meta, option=orjson.OPT_INDENT_2)[:-2])
+        f.write(b',\n  "reviews": [')
+        for i, review in enumerate(reviews):
+            f.write(b"\n    " if i == 0 else b",\n    ")
+            f.write(orjson.dumps(review_to_dict(review)))
+        f.write(b"\n  ]\n}")
+
+
+async def lookup_app_name(app_id: str, locale: str) -> str:
+    """
+    Look up an app's display name via the iTunes lookup API.
+    
+    Results are cached by (app_id, country); falls back to the app ID.
+    """
+    # Use the locale's country code for lookup
+    country = locale.split("-")[-1].lower() if "-" in locale else "us"
+    cache = get_cache_manager()
+    cache_key = f"app_name:{app_id}:{country}"
+    
+    cached = await cache.get_json(cache_key)
+    if cached and "name" in cached:
+        return cached["name"]
+    
+    try:
+        response = await get_http_client().get(
+            "https://itunes.apple.com/lookup",
+            params={"id": app_id, "country": country},
+            timeout=5.0
+        )
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            if data.get("resultCount", 0) > 0:
+                name = data["results"][0].get("trackName", app_id)
+                await cache.set_json(
+                    cache_key, {"name": name}, ttl=get_settings().review_cache_ttl
+                )
+                return name
+    except Exception:
+        pass  # Use app_id as fallback
+    
+    return app_id
 
 
 def extract_app_id(app_url: str, platform: str) -> str:
     """Extract app ID from store URL."""
-    import re
-    
-    if platform == "ios":
-        # iOS App Store URL: https://apps.apple.com/us/app/app-name/id123456789
-        match = re.search(r"/id(\d+)", app_url)
-        if match:
-            return match.group(1)
-    else:
-        # Google Play URL: https://play.google.com/store/apps/details?id=com.example.app
-        match = re.search(r"id=([^&]+)", app_url)
-        if match:
-            return match.group(1)
+    match = _APP_ID_PATTERN.search(app_url)
+    if match:
+        if platform == "ios":
+            # iOS App Store URL: https://apps.apple.com/us/app/app-name/id123456789
+            app_id = match["path_id"] or match["query_id"]
+            if app_id.isdigit():
+                return app_id
+        elif match["query_id"]:
+            # Google Play URL: https://play.google.com/store/apps/details?id=com.example.app
+            return match["query_id"]
     
     raise ValueError(f"Could not extract app ID from URL: {app_url}")
 
 
-@router.post(
-    "/analyze",
-    response_model=AnalyzeResponse,
-    responses={400: {"model": ErrorResponse}},
-    summary="Create analysis job",
-    description="Submit an app URL for review analysis. Returns a job ID for tracking."
-)
-async def create_analysis(
-    request: AnalyzeRequest,
-    background_tasks: BackgroundTasks,
-    job_manager: JobManager = Depends(get_job_manager)
-) -> AnalyzeResponse:
-    """Create a new analysis job or return cached result."""
+def estimate_processing_time(review_limit: int) -> int:
+    """Estimate processing time (seconds) based on review limit."""
+    return 30 + (review_limit // 100) * 10
+
+
+def validate_analyze_request(request: AnalyzeRequest) -> str:
+    """Check locale support and return the app ID, raising HTTP 400 on bad input."""
     settings = get_settings()
     
     # Validate locale if provided
     if request.options.locale and request.options.locale not in settings.locales_list:
         raise HTTPException(
             status_code=400,
-            detail=ErrorResponse(
-                error=f"Unsupported locale: {request.options.locale}",
-                error_code=ErrorCode.INVALID_INPUT,
+            detail=error_detail(
+                f"Unsupported locale: {request.options.locale}",
                 details=f"Supported locales: {settings.locales_list}"
-            ).model_dump()
+            )
         )
     
     # Extract app ID
     try:
-        app_id = extract_app_id(request.app_url, request.platform.value)
+        return extract_app_id(request.app_url, request.platform.value)
     except ValueError as e:
         raise HTTPException(
             status_code=400,
-            detail=ErrorResponse(
-                error=str(e),
-                error_code=ErrorCode.INVALID_INPUT
-            ).model_dump()
+            detail=error_detail(str(e))
         )
+
+
+def existing_job_response(
+    cached_job: Optional[JobData],
+    estimated_time: int
+) -> Optional[AnalyzeResponse]:
+    """Response for a reusable job with the same request hash, if there is one."""
+    if not cached_job:
+        return None
     
-    # Generate request hash for caching
-    request_hash = generate_request_hash(request)
-    
-    # Check if cached result exists
-    cached_job = await job_manager.get_by_hash(request_hash)
-    if cached_job and cached_job.status == JobStatus.COMPLETED:
+    # Completed result can be served from cache
+    if cached_job.status == JobStatus.COMPLETED:
         return AnalyzeResponse(
             analysis_id=cached_job.analysis_id,
             status=cached_job.status,
@@ -102,9 +206,46 @@ async def create_analysis(
             cached=True
         )
     
+    # Join an identical job that is still running instead of starting another
+    if JobManager.is_in_flight(cached_job):
+        return AnalyzeResponse(
+            analysis_id=cached_job.analysis_id,
+            status=cached_job.status,
+            estimated_time_sec=estimated_time * (100 - cached_job.progress) // 100,
+            cached=False
+        )
+    
+    return None
+
+
+@router.post(
+    "/analyze",
+    response_model=AnalyzeResponse,
+    responses={400: {"model": ErrorResponse}},
+    summary="Create analysis job",
+    description="Submit an app URL for review analysis. Returns a job ID for tracking."
+)
+async def create_analysis(
+    request: AnalyzeRequest,
+    background_tasks: BackgroundTasks,
+    job_manager: JobManager = Depends(get_job_manager)
+) -> AnalyzeResponse:
+    """Create a new analysis job or return cached result."""
+    app_id = validate_analyze_request(request)
+    
+    # Generate request hash for caching
+    request_hash = generate_request_hash(request)
+    estimated_time = estimate_processing_time(request.options.review_limit)
+    
+    # Check if cached or in-flight job exists
+    cached_job = await job_manager.get_by_hash(request_hash)
+    existing = existing_job_response(cached_job, estimated_time)
+    if existing:
+        return existing
+    
     # Create new job
-    analysis_id = str(uuid.uuid4())
-    await job_manager.create_job(
+    analysis_id = generate_analysis_id()
+    job = await job_manager.create_job(
         analysis_id=analysis_id,
         app_url=request.app_url,
         app_id=app_id,
@@ -113,12 +254,13 @@ async def create_analysis(
         request_hash=request_hash
     )
     
+    # A concurrent identical request claimed the hash first
+    if job.analysis_id != analysis_id:
+        return existing_job_response(job, estimated_time)
+    
     # Start background processing
     background_tasks.add_task(process_job, analysis_id)
     
-    # Estimate processing time based on review limit
-    estimated_time = 30 + (request.options.review_limit // 100) * 10
-    
     return AnalyzeResponse(
         analysis_id=analysis_id,
         status=JobStatus.CREATED,
@@ -127,6 +269,82 @@ async def create_analysis(
     )
 
 
+@router.post(
+    "/analyze/batch",
+    response_model=List[AnalyzeResponse],
+    responses={400: {"model": ErrorResponse}},
+    summary="Create analysis jobs in bulk",
+    description=(
+        f"Submit up to {_MAX_BATCH_SIZE} analysis requests at once. "
+        "Responses are returned in request order; duplicates share one job."
+    )
+)
+async def create_analysis_batch(
+    requests: List[AnalyzeRequest],
+    background_tasks: BackgroundTasks,
+    job_manager: JobManager = Depends(get_job_manager)
+) -> List[AnalyzeResponse]:
+    """Create analysis jobs for several requests, reusing cached and in-flight jobs."""
+    if not requests or len(requests) > _MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=error_detail(f"Batch must contain 1-{_MAX_BATCH_SIZE} requests")
+        )
+    
+    # Validate everything before creating any job
+    app_ids = [validate_analyze_request(r) for r in requests]
+    hashes = [generate_request_hash(r) for r in requests]
+    
+    # One round trip for all hash lookups
+    cached_jobs = await job_manager.get_by_hash_many(list(set(hashes)))
+    
+    responses: dict = {}
+    new_jobs = []
+    pending = []
+    for request, app_id, request_hash in zip(requests, app_ids, hashes):
+        if request_hash in responses:
+            continue
+        
+        estimated_time = estimate_processing_time(request.options.review_limit)
+        existing = existing_job_response(cached_jobs.get(request_hash), estimated_time)
+        if existing:
+            responses[request_hash] = existing
+            continue
+        
+        analysis_id = generate_analysis_id()
+        pending.append((request_hash, analysis_id, estimated_time))
+        new_jobs.append(job_manager.create_job(
+            analysis_id=analysis_id,
+            app_url=request.app_url,
+            app_id=app_id,
+            platform=request.platform,
+            options=request.options,
+            request_hash=request_hash
+        ))
+        responses[request_hash] = AnalyzeResponse(
+            analysis_id=analysis_id,
+            status=JobStatus.CREATED,
+            estimated_time_sec=estimated_time,
+            cached=False
+        )
+    
+    if new_jobs:
+        created = await asyncio.gather(*new_jobs)
+        
+        scheduled = []
+        for (request_hash, analysis_id, estimated_time), job in zip(pending, created):
+            if job.analysis_id == analysis_id:
+                scheduled.append(analysis_id)
+            else:
+                # A concurrent identical request claimed the hash first
+                responses[request_hash] = existing_job_response(job, estimated_time)
+        
+        if scheduled:
+            background_tasks.add_task(process_jobs, scheduled)
+    
+    return [responses[h] for h in hashes]
+
+
 @router.get(
     "/status/{analysis_id}",
     response_model=StatusResponse,
@@ -144,10 +362,7 @@ async def get_status(
     if not job:
         raise HTTPException(
             status_code=404,
-            detail=ErrorResponse(
-                error=f"Analysis job not found: {analysis_id}",
-                error_code=ErrorCode.INVALID_INPUT
-            ).model_dump()
+            detail=error_detail(f"Analysis job not found: {analysis_id}")
         )
     
     return StatusResponse(
@@ -179,28 +394,22 @@ async def get_result(
     if not job:
         raise HTTPException(
             status_code=404,
-            detail=ErrorResponse(
-                error=f"Analysis job not found: {analysis_id}",
-                error_code=ErrorCode.INVALID_INPUT
-            ).model_dump()
+            detail=error_detail(f"Analysis job not found: {analysis_id}")
         )
     
     if job.status != JobStatus.COMPLETED:
         raise HTTPException(
             status_code=400,
-            detail=ErrorResponse(
-                error=f"Analysis not yet completed. Current status: {job.status.value}",
-                error_code=ErrorCode.INVALID_INPUT
-            ).model_dump()
+            detail=error_detail(f"Analysis not yet completed. Current status: {job.status.value}")
         )
     
     if not job.result:
         raise HTTPException(
             status_code=500,
-            detail=ErrorResponse(
-                error="Result not available despite completed status",
-                error_code=ErrorCode.SCHEMA_VALIDATION_FAILED
-            ).model_dump()
+            detail=error_detail(
+                "Result not available despite completed status",
+                ErrorCode.SCHEMA_VALIDATION_FAILED
+            )
         )
     
     return ResultResponse(
@@ -221,36 +430,31 @@ async def get_result(
 async def export_pdf(
     analysis_id: str,
     job_manager: JobManager = Depends(get_job_manager)
-) -> StreamingResponse:
+) -> Response:
     """Export analysis result as PDF."""
     job = await job_manager.get_job(analysis_id)
     
     if not job:
         raise HTTPException(
             status_code=404,
-            detail=ErrorResponse(
-                error=f"Analysis job not found: {analysis_id}",
-                error_code=ErrorCode.INVALID_INPUT
-            ).model_dump()
+            detail=error_detail(f"Analysis job not found: {analysis_id}")
         )
     
     if job.status != JobStatus.COMPLETED or not job.result:
         raise HTTPException(
             status_code=400,
-            detail=ErrorResponse(
-                error="Analysis must be completed before exporting PDF",
-                error_code=ErrorCode.INVALID_INPUT
-            ).model_dump()
+            detail=error_detail("Analysis must be completed before exporting PDF")
         )
     
     # Generate PDF
-    pdf_buffer = generate_pdf_report(job.result)
+    pdf_bytes = await render_pdf_report(job.result)
     
-    return StreamingResponse(
-        io.BytesIO(pdf_buffer),
+    # Already fully in memory: send the bytes as-is rather than re-buffering for streaming
+    return Response(
+        content=pdf_bytes,
         media_type="application/pdf",
         headers={
-            "Content-Disposition": f'attachment; filename="app_review_analysis_{analysis_id[:8]}.pdf"'
+            "Content-Disposition": f'attachment; filename="app_review_analysis_{analysis_id[-8:]}.pdf"'
         }
     )
 
@@ -273,61 +477,34 @@ async def health_check():
 @router.post(
     "/fetch-reviews",
     summary="Fetch and save reviews",
-    description="Fetch reviews from app store and save to JSON file (no AI analysis)."
+    description=(
+        "Fetch reviews from app store and save to JSON file (no AI analysis). "
+        "The reviews themselves are included only with include_reviews=true. "
+        "With stream=true the response is NDJSON: a header line followed by one line per review."
+    )
 )
 async def fetch_reviews(
     app_url: str,
     platform: str = "ios",
     locale: str = "en-US",
-    limit: int = 100
+    limit: int = 100,
+    stream: bool = False,
+    include_reviews: bool = False
 ):
     """Fetch reviews and save to JSON file for inspection."""
-    import re
-    import httpx
-    
-    # Extract app ID from various URL formats
-    # Handles: /id123, /id/123, id=123
-    # Also handles country codes like /tr/, /us/, /gb/ in URLs
-    if platform == "ios":
-        # Try multiple patterns for iOS App Store URLs
-        patterns = [
-            r"/id(\d+)",           # Standard: /id389801252
-            r"/id/(\d+)",          # Alternative: /id/389801252
-            r"[?&]id=(\d+)",       # Query param: ?id=389801252
-        ]
-        app_id = None
-        for pattern in patterns:
-            match = re.search(pattern, app_url)
-            if match:
-                app_id = match.group(1)
-                break
-        
-        if not app_id:
+    # Extract app ID (country codes like /tr/, /us/, /gb/ in URLs are ignored)
+    try:
+        app_id = extract_app_id(app_url, platform)
+    except ValueError:
+        if platform == "ios":
             raise HTTPException(status_code=400, detail="Invalid iOS App Store URL. Could not extract app ID.")
-    else:
-        match = re.search(r"id=([^&]+)", app_url)
-        if match:
-            app_id = match.group(1)
-        else:
-            raise HTTPException(status_code=400, detail="Invalid Play Store URL")
+        raise HTTPException(status_code=400, detail="Invalid Play Store URL")
     
     # Get app name from App Store API
-    app_name = app_id  # fallback
-    try:
-        async with httpx.AsyncClient() as client:
-            # Use the locale's country code for lookup
-            country = locale.split("-")[-1].lower() if "-" in locale else "us"
-            lookup_url = f"https://itunes.apple.com/lookup?id={app_id}&country={country}"
-            response = await client.get(lookup_url)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("resultCount", 0) > 0:
-                    app_name = data["results"][0].get("trackName", app_id)
-    except Exception:
-        pass  # Use app_id as fallback
+    app_name = await lookup_app_name(app_id, locale)
     
     # Clean app name for filename (remove special characters)
-    safe_name = re.sub(r'[^\w\s-]', '', app_name).strip().replace(' ', '_').lower()
+    safe_name = _UNSAFE_NAME_CHARS.sub('', app_name).strip().replace(' ', '_').lower()
     
     # Fetch reviews
     fetcher = ReviewFetcher()
@@ -348,35 +525,42 @@ async def fetch_reviews(
     filename = f"{safe_name}_reviews.json"
     filepath = data_dir / filename
     
-    reviews_data = {
+    reviews_meta = {
         "app_name": app_name,
         "app_id": app_id,
         "platform": platform,
         "locale": locale,
         "total_reviews": len(reviews),
-        "reviews": [r.model_dump(mode="json") for r in reviews]
     }
     
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(reviews_data, f, indent=2, ensure_ascii=False, default=str)
+    # Serialise and write off the event loop; the file can be several MB
+    await asyncio.to_thread(write_reviews_file, filepath, reviews_meta, reviews)
     
-    # Return ALL reviews, not just sample
-    return {
+    header = {
         "message": f"Saved {len(reviews)} reviews",
         "app_name": app_name,
         "file": str(filepath),
         "app_id": app_id,
         "locale": locale,
         "total_reviews": len(reviews),
-        "reviews": [
-            {
-                "rating": r.rating,
-                "title": r.title,
-                "body": r.body,
-                "date": r.date.isoformat() if r.date else None
-            }
-            for r in reviews
-        ]
     }
+    
+    if stream:
+        # Async generator: a sync one would be iterated in the threadpool
+        async def ndjson_lines():
+            yield orjson.dumps({"header": header}) + b"\n"
+            for r in reviews:
+                yield orjson.dumps(review_to_dict(r)) + b"\n"
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    if include_reviews:
+        # Serialise directly; skips jsonable_encoder walking every review
+        return Response(
+            content=orjson.dumps({**header, "reviews": [review_to_dict(r) for r in reviews]}),
+            media_type="application/json"
+        )
+    
+    return header
 
 
@@ -4,11 +4,22 @@ App Reviewer AI - API Schemas
 Pydantic models for request/response validation.
 """
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 from typing import Optional, List, Literal
 from enum import Enum
-from datetime import datetime
-import re
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+
+# Supported store hosts
+_IOS_HOST = "apps.apple.com"
+_ANDROID_HOST = "play.google.com"
+_ANDROID_DETAILS_PATH = "/store/apps/details"
+
+
+def utc_now() -> datetime:
+    """Current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
 
 
 # ============================================================================
@@ -96,14 +107,21 @@ class AnalyzeRequest(BaseModel):
     @classmethod
     def validate_app_url(cls, v: str) -> str:
         """Validate that URL is from supported app stores."""
-        ios_pattern = r"https?://apps\.apple\.com/.+/app/.+"
-        android_pattern = r"https?://play\.google\.com/store/apps/details\?id=.+"
+        u = urlparse(v)
         
-        if not (re.match(ios_pattern, v) or re.match(android_pattern, v)):
-            raise ValueError(
-                "URL must be a valid App Store or Play Store URL"
-            )
-        return v
+        if u.scheme in ("http", "https"):
+            if u.netloc == _IOS_HOST:
+                # e.g. /us/app/name/id123456789
+                i = u.path.find("/app/", 2)
+                if i != -1 and len(u.path) > i + 5:
+                    return v
+            elif u.netloc == _ANDROID_HOST:
+                if u.path == _ANDROID_DETAILS_PATH and u.query.startswith("id=") and len(u.query) > 3:
+                    return v
+        
+        raise ValueError(
+            "URL must be a valid App Store or Play Store URL"
+        )
 
 
 # ============================================================================
@@ -183,7 +201,7 @@ class InsightResult(BaseModel):
     platform: Platform = Field(..., description="Platform")
     reviews_analyzed: int = Field(..., description="Number of reviews analyzed")
     analysis_version: str = Field(..., description="Analysis version used")
-    generated_at: datetime = Field(default_factory=datetime.utcnow, description="Generation timestamp")
+    generated_at: datetime = Field(default_factory=utc_now, description="Generation timestamp")
 
 
 class ResultResponse(BaseModel):
@@ -221,6 +239,10 @@ class Review(BaseModel):
     detected_language: Optional[str] = Field(default=None, description="Detected language")
 
 
+# (De)serialises review lists straight to/from JSON, for cache storage
+ReviewList = TypeAdapter(List[Review])
+
+
 class JobData(BaseModel):
     """Internal job data model."""
     analysis_id: str
@@ -233,8 +255,8 @@ class JobData(BaseModel):
     progress: int = 0
     error: Optional[str] = None
     error_code: Optional[ErrorCode] = None
-    reviews: List[Review] = Field(default_factory=list)
+    reviews_count: int = 0  # reviews themselves are stored under their own key
     result: Optional[InsightResult] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
     tokens_used: int = 0
@@ -7,6 +7,7 @@ Handles all environment-based configuration with validation.
 from pydantic_settings import BaseSettings
 from pydantic import Field
 from typing import List
+from functools import lru_cache
 
 
 class Settings(BaseSettings):
@@ -15,6 +16,14 @@ class Settings(BaseSettings):
     # OpenAI Configuration
     openai_api_key: str = Field(..., description="OpenAI API key")
     openai_model: str = Field(default="gpt-4-turbo-preview", description="OpenAI model to use")
+    max_parallel_chunks: int = Field(default=5, description="Concurrent OpenAI calls per pipeline")
+    max_failed_chunk_ratio: float = Field(default=0.2, description="Share of failed chunks a pipeline tolerates before failing the job")
+    enable_llm_cache: bool = Field(default=True, description="Reuse responses for identical OpenAI calls")
+    chunk_token_budget: int = Field(default=3000, description="Approximate review tokens per prompt chunk")
+    fused_pipelines: bool = Field(default=True, description="Analyse each chunk with one combined call instead of four")
+    fused_pipeline_threshold: int = Field(default=100, description="Max reviews sent as a single combined prompt")
+    openai_max_inflight: int = Field(default=20, description="Concurrent OpenAI calls across all workers (per process without Redis)")
+    openai_inflight_window: int = Field(default=300, description="Seconds before an unreleased OpenAI slot is reclaimed")
     
     # Redis Configuration
     redis_url: str = Field(default="redis://localhost:6379/0", description="Redis connection URL")
@@ -28,9 +37,13 @@ class Settings(BaseSettings):
     max_review_count: int = Field(default=1000, description="Maximum reviews to process")
     default_review_limit: int = Field(default=500, description="Default review limit")
     
+    # Report Generation
+    pdf_workers: int = Field(default=1, description="PDF render processes per API process (0 = CPU count)")
+    
     # Cache TTL (seconds)
     result_cache_ttl: int = Field(default=86400, description="Result cache TTL (24 hours)")
     review_cache_ttl: int = Field(default=3600, description="Review cache TTL (1 hour)")
+    llm_cache_ttl: int = Field(default=86400, description="Memoized OpenAI response TTL (24 hours)")
     
     # Supported Locales
     supported_locales: str = Field(default="en-US,en-GB", description="Comma-separated locales")
@@ -46,13 +59,7 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-# Cached settings instance
-_settings: Settings | None = None
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get settings instance (reload on each server start)."""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    return Settings()
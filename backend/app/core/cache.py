@@ -5,10 +5,15 @@ Handles Redis connections and caching operations.
 """
 
 import redis.asyncio as redis
-from typing import Optional, Any
-import json
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from typing import Optional, Any, Callable, Dict, Tuple
+import orjson
+import fnmatch
 import logging
-from functools import lru_cache
+import math
+import time
+from collections import defaultdict
+from functools import lru_cache, wraps
 
 from app.config import get_settings
 
@@ -17,27 +22,82 @@ logger = logging.getLogger(__name__)
 # Global Redis client
 _redis_client: Optional[redis.Redis] = None
 
+# Seconds to stay on the in-memory fallback before trying Redis again
+REDIS_RETRY_INTERVAL = 5.0
+
+# Patch top-level fields of a JSON document in place.
+# KEYS[1] = key; ARGV[1] = TTL (0 keeps the current TTL); ARGV[2..] = field, JSON value pairs.
+# Returns the patched document, nil if the key is missing, or -1 when this
+# server's cjson cannot preserve empty arrays (pre-7.0), so the caller falls back.
+_PATCH_JSON_LUA = """
+if not cjson.decode_array_with_array_mt then
+    return -1
+end
+local raw = redis.call('GET', KEYS[1])
+if not raw then
+    return nil
+end
+cjson.decode_array_with_array_mt(true)
+local doc = cjson.decode(raw)
+for i = 2, #ARGV, 2 do
+    doc[ARGV[i]] = cjson.decode(ARGV[i + 1])
+end
+local encoded = cjson.encode(doc)
+local ttl = tonumber(ARGV[1])
+if ttl > 0 then
+    redis.call('SET', KEYS[1], encoded, 'EX', ttl)
+else
+    redis.call('SET', KEYS[1], encoded, 'KEEPTTL')
+end
+return encoded
+"""
+
+# Set a key only if it still holds an expected value.
+# KEYS[1] = key; ARGV[1] = "1" if the key is expected to exist, else "0";
+# ARGV[2] = expected value; ARGV[3] = new value; ARGV[4] = TTL (0 for none).
+# Returns 1 if the value was swapped, 0 if the key changed in the meantime.
+_COMPARE_AND_SET_LUA = """
+local current = redis.call('GET', KEYS[1])
+if ARGV[1] == '1' then
+    if current ~= ARGV[2] then
+        return 0
+    end
+elseif current then
+    return 0
+end
+local ttl = tonumber(ARGV[4])
+if ttl > 0 then
+    redis.call('SET', KEYS[1], ARGV[3], 'EX', ttl)
+else
+    redis.call('SET', KEYS[1], ARGV[3])
+end
+return 1
+"""
+
 
 async def get_redis_client() -> Optional[redis.Redis]:
-    """Get or create Redis client."""
+    """
+    Get or create Redis client.
+    
+    The connection is verified once when the client is created; after that
+    redis-py health-checks idle connections itself.
+    """
     global _redis_client
     
     if _redis_client is not None:
-        try:
-            await _redis_client.ping()
-            return _redis_client
-        except Exception:
-            _redis_client = None
+        return _redis_client
     
     settings = get_settings()
     
     try:
-        _redis_client = redis.from_url(
+        client = redis.from_url(
             settings.redis_url,
             encoding="utf-8",
-            decode_responses=True
+            decode_responses=True,
+            health_check_interval=30
         )
-        await _redis_client.ping()
+        await client.ping()
+        _redis_client = client
         logger.info("Connected to Redis")
         return _redis_client
     except Exception as e:
@@ -45,76 +105,355 @@ async def get_redis_client() -> Optional[redis.Redis]:
         return None
 
 
+async def reset_redis_client() -> None:
+    """Drop the Redis client so the next call reconnects."""
+    global _redis_client
+    
+    if _redis_client is not None:
+        client, _redis_client = _redis_client, None
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+
 class InMemoryCache:
-    """Fallback in-memory cache when Redis is unavailable."""
+    """
+    Fallback in-memory cache when Redis is unavailable.
+    
+    Honours expiry like Redis: expired keys read as missing and are
+    swept out periodically so TTL'd entries do not accumulate.
+    """
+    
+    # Seconds between sweeps of expired keys
+    SWEEP_INTERVAL = 60.0
     
     def __init__(self):
         self._data: dict = {}
+        # Monotonic expiry time per key that has a TTL
+        self._expires: Dict[str, float] = {}
+        self._next_sweep = 0.0
+        # Keys grouped by namespace (text before the first ":")
+        self._prefix_index: Dict[str, set] = defaultdict(set)
     
-    async def get(self, key: str) -> Optional[str]:
+    def _remove(self, key: str) -> bool:
+        """Drop a key and its index entries; False if it was not stored."""
+        if key not in self._data:
+            return False
+        del self._data[key]
+        self._expires.pop(key, None)
+        namespace = key.split(":", 1)[0]
+        bucket = self._prefix_index.get(namespace)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._prefix_index[namespace]
+        return True
+    
+    def _live(self, key: str, now: Optional[float] = None) -> Optional[str]:
+        """Value of a key, expiring it first if its TTL has passed."""
+        expires = self._expires.get(key)
+        if expires is not None and expires <= (now if now is not None else time.monotonic()):
+            self._remove(key)
+            return None
         return self._data.get(key)
     
-    async def set(self, key: str, value: str, ex: Optional[int] = None) -> None:
+    def _sweep(self, now: float) -> None:
+        """Remove every expired key, at most once per SWEEP_INTERVAL."""
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.SWEEP_INTERVAL
+        for key in [k for k, expires in self._expires.items() if expires <= now]:
+            self._remove(key)
+    
+    async def get(self, key: str) -> Optional[str]:
+        return self._live(key)
+    
+    async def ttl(self, key: str) -> int:
+        """Seconds left before a key expires; -1 without a TTL, -2 if missing (as Redis)."""
+        if self._live(key) is None:
+            return -2
+        expires = self._expires.get(key)
+        if expires is None:
+            return -1
+        return math.ceil(expires - time.monotonic())
+    
+    async def set(
+        self,
+        key: str,
+        value: str,
+        ex: Optional[int] = None,
+        nx: bool = False,
+        keepttl: bool = False
+    ) -> Optional[bool]:
+        now = time.monotonic()
+        self._sweep(now)
+        if nx and self._live(key, now) is not None:
+            return None
         self._data[key] = value
+        if ex:
+            self._expires[key] = now + ex
+        elif not keepttl:
+            self._expires.pop(key, None)
+        self._prefix_index[key.split(":", 1)[0]].add(key)
+        return True
+    
+    async def compare_and_set(
+        self,
+        key: str,
+        expected: Optional[Any],
+        value: Any,
+        ex: Optional[int] = None
+    ) -> bool:
+        """Set `key` only if it still holds `expected` (None: only if missing)."""
+        if self._live(key) != expected:
+            return False
+        await self.set(key, value, ex=ex)
+        return True
+    
+    async def mget(self, keys: list) -> list:
+        now = time.monotonic()
+        return [self._live(k, now) for k in keys]
     
     async def delete(self, key: str) -> None:
-        self._data.pop(key, None)
+        self._remove(key)
     
     async def keys(self, pattern: str) -> list:
-        import fnmatch
-        return [k for k in self._data.keys() if fnmatch.fnmatch(k, pattern)]
+        now = time.monotonic()
+        prefix = pattern[:-1]
+        if pattern.endswith("*") and ":" in prefix and not any(c in prefix for c in "*?["):
+            bucket = self._prefix_index.get(prefix.split(":", 1)[0], ())
+            candidates = [k for k in bucket if k.startswith(prefix)]
+        else:
+            candidates = [k for k in self._data if fnmatch.fnmatch(k, pattern)]
+        return [k for k in candidates if self._live(k, now) is not None]
 
 
 # Fallback in-memory cache
 _memory_cache = InMemoryCache()
 
 
+def async_method_ttl_cache(ttl: int, maxsize: int = 1024) -> Callable:
+    """
+    Cache results of an async method in-process for `ttl` seconds.
+    
+    Entries are keyed on the call arguments (excluding `self`), so the
+    cache is shared by all instances. Exceptions are not cached.
+    """
+    def decorator(fn: Callable) -> Callable:
+        entries: Dict[Tuple, Tuple[Any, float]] = {}
+        
+        @wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            
+            entry = entries.get(key)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+            
+            value = await fn(self, *args, **kwargs)
+            
+            if key in entries:
+                # Refreshing an expired entry; re-insert it as the newest
+                del entries[key]
+            elif len(entries) >= maxsize:
+                # Evict the oldest entry to make room for a new key
+                entries.pop(next(iter(entries)))
+            entries[key] = (value, now + ttl)
+            return value
+        
+        return wrapper
+    return decorator
+
+
 class CacheManager:
     """Unified cache manager supporting Redis with in-memory fallback."""
     
     def __init__(self):
         self.settings = get_settings()
+        self._backend = None
+        self._patch_script = None
+        self._cas_script = None
+        # Monotonic time after which the in-memory fallback re-checks Redis
+        self._retry_at = 0.0
+    
+    def _fall_back(self) -> None:
+        """Switch to the in-memory fallback until the retry interval passes."""
+        self._backend = _memory_cache
+        self._retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
     
     async def _get_backend(self):
-        """Get cache backend (Redis or in-memory)."""
-        redis_client = await get_redis_client()
-        return redis_client if redis_client else _memory_cache
+        """
+        Get cache backend (Redis or in-memory).
+        
+        Redis is resolved once and kept while it works. On the in-memory
+        fallback, Redis is tried again every REDIS_RETRY_INTERVAL seconds
+        so a process recovers once Redis is back.
+        """
+        if self._backend is _memory_cache and time.monotonic() < self._retry_at:
+            return _memory_cache
+        
+        if self._backend is None or self._backend is _memory_cache:
+            redis_client = await get_redis_client()
+            if redis_client:
+                self._backend = redis_client
+            else:
+                self._fall_back()
+        return self._backend
+    
+    async def get_redis(self) -> Optional[redis.Redis]:
+        """Get the Redis client, or None when running on the in-memory fallback."""
+        backend = await self._get_backend()
+        return None if backend is _memory_cache else backend
+    
+    async def _execute(self, method: str, *args, **kwargs) -> Any:
+        """Run a backend operation, falling back to memory if Redis drops."""
+        backend = await self._get_backend()
+        try:
+            return await getattr(backend, method)(*args, **kwargs)
+        except (RedisConnectionError, RedisTimeoutError) as e:
+            logger.warning(f"Redis {method} failed: {e}. Using in-memory fallback.")
+            self._fall_back()
+            await reset_redis_client()
+            return await getattr(_memory_cache, method)(*args, **kwargs)
     
     async def get_json(self, key: str) -> Optional[dict]:
         """Get JSON value from cache."""
-        backend = await self._get_backend()
-        value = await backend.get(key)
+        value = await self._execute("get", key)
         if value:
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
+                return orjson.loads(value)
+            except orjson.JSONDecodeError:
                 return None
         return None
     
     async def set_json(self, key: str, value: dict, ttl: Optional[int] = None) -> None:
         """Set JSON value in cache."""
+        await self._execute("set", key, orjson.dumps(value, default=str), ex=ttl)
+    
+    async def set_json_nx(self, key: str, value: dict, ttl: Optional[int] = None) -> bool:
+        """Set JSON value only if the key does not exist; True if it was set."""
+        return bool(
+            await self._execute("set", key, orjson.dumps(value, default=str), ex=ttl, nx=True)
+        )
+    
+    async def get_raw(self, key: str) -> Optional[Any]:
+        """Get a pre-serialised value from cache, undecoded."""
+        return await self._execute("get", key)
+    
+    async def get_raw_many(self, keys: list) -> list:
+        """Get several pre-serialised values in one round trip (None for misses)."""
+        if not keys:
+            return []
+        return await self._execute("mget", keys)
+    
+    async def set_raw(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Set a pre-serialised (str/bytes) value in cache."""
+        await self._execute("set", key, value, ex=ttl)
+    
+    async def patch_json(
+        self,
+        key: str,
+        fields: Dict[str, Any],
+        ttl: Optional[int] = None
+    ) -> Optional[Any]:
+        """
+        Overwrite top-level fields of a cached JSON object.
+        
+        On Redis this is one atomic script call (EVALSHA); otherwise it is a
+        read-modify-write.
+        
+        Args:
+            key: Cache key of the JSON object
+            fields: Top-level fields to overwrite
+            ttl: New TTL in seconds; None keeps the key's current TTL
+        
+        Returns:
+            The patched document as raw JSON, or None if the key is missing
+        """
+        backend = await self._get_backend()
+        
+        if backend is not _memory_cache:
+            if self._patch_script is None:
+                self._patch_script = backend.register_script(_PATCH_JSON_LUA)
+            
+            args = [ttl or 0]
+            for name, value in fields.items():
+                args += [name, orjson.dumps(value, default=str)]
+            
+            try:
+                result = await self._patch_script(keys=[key], args=args, client=backend)
+                if result != -1:
+                    return result
+            except (RedisConnectionError, RedisTimeoutError) as e:
+                logger.warning(f"Redis patch failed: {e}. Using in-memory fallback.")
+                self._fall_back()
+                await reset_redis_client()
+        
+        raw = await self._execute("get", key)
+        if not raw:
+            return None
+        
+        try:
+            doc = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return None
+        doc.update(fields)
+        
+        encoded = orjson.dumps(doc, default=str)
+        if ttl:
+            await self._execute("set", key, encoded, ex=ttl)
+        else:
+            await self._execute("set", key, encoded, keepttl=True)
+        return encoded
+    
+    async def compare_and_set(
+        self,
+        key: str,
+        expected: Optional[Any],
+        value: Any,
+        ttl: Optional[int] = None
+    ) -> bool:
+        """
+        Atomically replace a raw value if it is unchanged.
+        
+        Args:
+            key: Cache key
+            expected: Raw value last read from the key (as from get_raw),
+                or None to set only if the key is missing
+            value: New pre-serialised value
+            ttl: TTL in seconds for the new value
+        
+        Returns:
+            True if the value was set; False if the key changed meanwhile
+        """
         backend = await self._get_backend()
-        json_str = json.dumps(value, default=str)
-        await backend.set(key, json_str, ex=ttl)
+        
+        if backend is not _memory_cache:
+            if self._cas_script is None:
+                self._cas_script = backend.register_script(_COMPARE_AND_SET_LUA)
+            
+            args = ["0" if expected is None else "1", expected or "", value, ttl or 0]
+            try:
+                return bool(await self._cas_script(keys=[key], args=args, client=backend))
+            except (RedisConnectionError, RedisTimeoutError) as e:
+                logger.warning(f"Redis compare-and-set failed: {e}. Using in-memory fallback.")
+                self._fall_back()
+                await reset_redis_client()
+        
+        return await _memory_cache.compare_and_set(key, expected, value, ex=ttl)
     
     async def delete(self, key: str) -> None:
         """Delete key from cache."""
-        backend = await self._get_backend()
-        await backend.delete(key)
+        await self._execute("delete", key)
     
     async def find_keys(self, pattern: str) -> list:
         """Find keys matching pattern."""
-        backend = await self._get_backend()
-        return await backend.keys(pattern)
-
-
-# Global cache manager instance
-_cache_manager: Optional[CacheManager] = None
+        return await self._execute("keys", pattern)
 
 
+@lru_cache(maxsize=1)
 def get_cache_manager() -> CacheManager:
     """Get cache manager singleton."""
-    global _cache_manager
-    if _cache_manager is None:
-        _cache_manager = CacheManager()
-    return _cache_manager
+    return CacheManager()
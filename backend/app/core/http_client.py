@@ -0,0 +1,52 @@
+"""
+App Reviewer AI - Shared HTTP Client
+
+Provides a process-wide httpx client so outbound requests reuse pooled connections.
+"""
+
+import httpx
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Connection pool limits for the shared client
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# Default request timeout (seconds)
+HTTP_TIMEOUT = 30.0
+
+# Default headers sent with every request (the Play Store rejects bare clients)
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+# Global HTTP client
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client."""
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        # HTTP/2 multiplexes concurrent page fetches over one connection;
+        # httpx already negotiates and decodes gzip/deflate responses.
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=HTTP_LIMITS,
+            timeout=HTTP_TIMEOUT,
+            headers=DEFAULT_HEADERS
+        )
+        logger.info("Created shared HTTP client")
+
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (call on application shutdown)."""
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -4,13 +4,17 @@ App Reviewer AI - Job Manager
 Manages job lifecycle, state transitions, and persistence.
 """
 
-from typing import Optional, Dict
-from datetime import datetime
+from typing import Optional, Dict, List, Any
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 import logging
 
+import orjson
+from pydantic import ValidationError
+
 from app.api.schemas import (
     JobData, JobStatus, Platform, AnalysisOptions, 
-    ErrorCode, InsightResult, Review
+    ErrorCode, InsightResult, Review, ReviewList, utc_now
 )
 from app.core.cache import get_cache_manager
 from app.config import get_settings
@@ -24,6 +28,19 @@ class JobManager:
     # Cache key prefixes
     JOB_PREFIX = "job:"
     HASH_PREFIX = "hash:"
+    RESULT_PREFIX = "result:"
+    REVIEWS_PREFIX = "job_reviews:"
+    
+    # Jobs in these states are still running; identical requests join them
+    IN_FLIGHT_STATUSES = frozenset({
+        JobStatus.CREATED,
+        JobStatus.FETCHING_REVIEWS,
+        JobStatus.ANALYZING_REVIEWS,
+        JobStatus.AGGREGATING_RESULTS,
+    })
+    
+    # In-flight jobs not updated for this long are assumed dead
+    IN_FLIGHT_MAX_IDLE = timedelta(minutes=15)
     
     def __init__(self):
         self.cache = get_cache_manager()
@@ -37,6 +54,72 @@ class JobManager:
         """Generate cache key for request hash."""
         return f"{self.HASH_PREFIX}{request_hash}"
     
+    def _reviews_key(self, analysis_id: str) -> str:
+        """Generate cache key for a job's fetched reviews."""
+        return f"{self.REVIEWS_PREFIX}{analysis_id}"
+    
+    def _result_key(self, request_hash: str) -> str:
+        """Generate cache key for a request's final result."""
+        return f"{self.RESULT_PREFIX}{request_hash}"
+    
+    async def _save_job(self, job: JobData) -> None:
+        """Persist job, serialised straight to JSON by Pydantic."""
+        await self.cache.set_raw(
+            self._job_key(job.analysis_id),
+            job.model_dump_json(),
+            ttl=self.settings.result_cache_ttl
+        )
+    
+    @classmethod
+    def is_in_flight(cls, job: JobData) -> bool:
+        """Whether the job is still running (and recently updated)."""
+        updated_at = job.updated_at
+        if updated_at.tzinfo is None:
+            # Written before timestamps were timezone-aware
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        
+        return (
+            job.status in cls.IN_FLIGHT_STATUSES
+            and utc_now() - updated_at < cls.IN_FLIGHT_MAX_IDLE
+        )
+    
+    @classmethod
+    def is_reusable(cls, job: JobData) -> bool:
+        """Whether an identical request can be served by this job."""
+        return job.status == JobStatus.COMPLETED or cls.is_in_flight(job)
+    
+    async def _patch_raw(
+        self,
+        analysis_id: str,
+        updated_at: Optional[datetime] = None,
+        **fields: Any
+    ) -> Optional[Any]:
+        """
+        Overwrite top-level job fields in one cache call.
+        
+        Returns:
+            The patched job as raw JSON, or None if the job is missing
+        """
+        fields["updated_at"] = updated_at or utc_now()
+        
+        return await self.cache.patch_json(
+            self._job_key(analysis_id),
+            fields,
+            ttl=self.settings.result_cache_ttl
+        )
+    
+    async def _patch_job(
+        self,
+        analysis_id: str,
+        updated_at: Optional[datetime] = None,
+        **fields: Any
+    ) -> Optional[JobData]:
+        """Overwrite top-level job fields and return the validated job; None if job is missing."""
+        raw = await self._patch_raw(analysis_id, updated_at, **fields)
+        if not raw:
+            return None
+        return JobData.model_validate_json(raw)
+    
     async def create_job(
         self,
         analysis_id: str,
@@ -46,7 +129,16 @@ class JobManager:
         options: AnalysisOptions,
         request_hash: str
     ) -> JobData:
-        """Create a new analysis job."""
+        """
+        Create a new analysis job.
+        
+        The request hash is claimed atomically (SET NX). If another job
+        already holds it and is reusable, the new job is discarded and the
+        existing one returned; callers should compare analysis_id before
+        scheduling work. Failed or dead holders are taken over with a
+        compare-and-set, so of several requests racing for the same dead
+        holder only one wins and the others join it.
+        """
         job = JobData(
             analysis_id=analysis_id,
             app_url=app_url,
@@ -59,122 +151,203 @@ class JobManager:
         )
         
         # Store job data
-        await self.cache.set_json(
-            self._job_key(analysis_id),
-            job.model_dump(mode="json"),
-            ttl=self.settings.result_cache_ttl
-        )
+        await self._save_job(job)
         
-        # Store hash -> analysis_id mapping
-        await self.cache.set_json(
-            self._hash_key(request_hash),
-            {"analysis_id": analysis_id},
-            ttl=self.settings.result_cache_ttl
+        # Claim hash -> analysis_id mapping
+        hash_key = self._hash_key(request_hash)
+        mapping = {"analysis_id": analysis_id}
+        claimed = await self.cache.set_json_nx(
+            hash_key, mapping, ttl=self.settings.result_cache_ttl
         )
         
+        while not claimed:
+            raw = await self.cache.get_raw(hash_key)
+            existing = await self._get_by_mapping(raw)
+            if existing and existing.analysis_id != analysis_id and self.is_reusable(existing):
+                await self.cache.delete(self._job_key(analysis_id))
+                logger.info(f"Request {request_hash[:8]} already claimed by job {existing.analysis_id}")
+                return existing
+            
+            # Previous holder failed or died; take over the mapping unless
+            # another request did so first (then re-check the new holder)
+            claimed = await self.cache.compare_and_set(
+                hash_key, raw, orjson.dumps(mapping), ttl=self.settings.result_cache_ttl
+            )
+        
         logger.info(f"Created job {analysis_id} for app {app_id}")
         return job
     
     async def get_job(self, analysis_id: str) -> Optional[JobData]:
         """Get job by analysis ID."""
-        data = await self.cache.get_json(self._job_key(analysis_id))
-        if data:
-            return JobData(**data)
+        raw = await self.cache.get_raw(self._job_key(analysis_id))
+        if raw:
+            try:
+                return JobData.model_validate_json(raw)
+            except ValidationError as e:
+                logger.warning(f"Discarding unreadable job {analysis_id}: {e}")
         return None
     
-    async def get_by_hash(self, request_hash: str) -> Optional[JobData]:
-        """Get job by request hash (for cache lookup)."""
-        mapping = await self.cache.get_json(self._hash_key(request_hash))
-        if mapping and "analysis_id" in mapping:
+    async def get_jobs(self, analysis_ids: List[str]) -> Dict[str, JobData]:
+        """Get several jobs in one cache round trip; missing jobs are omitted."""
+        raws = await self.cache.get_raw_many([self._job_key(i) for i in analysis_ids])
+        
+        jobs = {}
+        for analysis_id, raw in zip(analysis_ids, raws):
+            if raw:
+                try:
+                    jobs[analysis_id] = JobData.model_validate_json(raw)
+                except ValidationError as e:
+                    logger.warning(f"Discarding unreadable job {analysis_id}: {e}")
+        return jobs
+    
+    async def get_by_hash_many(self, request_hashes: List[str]) -> Dict[str, JobData]:
+        """Batch version of get_by_hash; hashes without a job are omitted."""
+        raws = await self.cache.get_raw_many([self._hash_key(h) for h in request_hashes])
+        
+        ids_by_hash = {}
+        for request_hash, raw in zip(request_hashes, raws):
+            if raw:
+                try:
+                    mapping = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    continue
+                if "analysis_id" in mapping:
+                    ids_by_hash[request_hash] = mapping["analysis_id"]
+        
+        jobs = await self.get_jobs(list(ids_by_hash.values()))
+        return {
+            request_hash: jobs[analysis_id]
+            for request_hash, analysis_id in ids_by_hash.items()
+            if analysis_id in jobs
+        }
+    
+    async def _get_by_mapping(self, raw: Optional[Any]) -> Optional[JobData]:
+        """Get the job a raw hash -> analysis_id mapping points to."""
+        if not raw:
+            return None
+        try:
+            mapping = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return None
+        if isinstance(mapping, dict) and "analysis_id" in mapping:
             return await self.get_job(mapping["analysis_id"])
         return None
     
+    async def get_by_hash(self, request_hash: str) -> Optional[JobData]:
+        """Get job by request hash (for cache lookup)."""
+        return await self._get_by_mapping(await self.cache.get_raw(self._hash_key(request_hash)))
+    
     async def update_status(
         self,
         analysis_id: str,
         status: JobStatus,
         progress: Optional[int] = None,
         error: Optional[str] = None,
-        error_code: Optional[ErrorCode] = None
-    ) -> Optional[JobData]:
-        """Update job status."""
-        job = await self.get_job(analysis_id)
-        if not job:
-            return None
+        error_code: Optional[ErrorCode] = None,
+        updated_at: Optional[datetime] = None
+    ) -> bool:
+        """
+        Update job status; False if the job is missing.
         
-        job.status = status
-        job.updated_at = datetime.utcnow()
+        Pass updated_at to stamp several back-to-back updates with one clock read.
+        """
+        fields: Dict[str, Any] = {"status": status}
         
         if progress is not None:
-            job.progress = progress
+            fields["progress"] = progress
         
         if error:
-            job.error = error
-            job.error_code = error_code
+            fields["error"] = error
+            fields["error_code"] = error_code
         
-        await self.cache.set_json(
-            self._job_key(analysis_id),
-            job.model_dump(mode="json"),
-            ttl=self.settings.result_cache_ttl
-        )
+        # Status fields are already valid scalars; skip materializing JobData
+        if not await self._patch_raw(analysis_id, updated_at, **fields):
+            return False
         
         logger.info(f"Job {analysis_id} status: {status.value} ({progress}%)")
-        return job
+        return True
     
     async def set_reviews(
         self,
         analysis_id: str,
-        reviews: list[Review]
+        reviews: list[Review],
+        updated_at: Optional[datetime] = None
     ) -> Optional[JobData]:
-        """Store fetched reviews for job."""
-        job = await self.get_job(analysis_id)
+        """
+        Store fetched reviews for job.
+        
+        Reviews are written once under their own key so status updates
+        do not move them; the job only records the count.
+        """
+        job = await self._patch_job(analysis_id, updated_at, reviews_count=len(reviews))
         if not job:
             return None
         
-        job.reviews = reviews
-        job.updated_at = datetime.utcnow()
-        
-        await self.cache.set_json(
-            self._job_key(analysis_id),
-            job.model_dump(mode="json"),
+        await self.cache.set_raw(
+            self._reviews_key(analysis_id),
+            ReviewList.dump_json(reviews),
             ttl=self.settings.result_cache_ttl
         )
         
         logger.info(f"Job {analysis_id}: stored {len(reviews)} reviews")
         return job
     
+    async def get_reviews(self, analysis_id: str) -> List[Review]:
+        """Get the reviews fetched for a job (empty if none stored)."""
+        raw = await self.cache.get_raw(self._reviews_key(analysis_id))
+        if raw:
+            try:
+                return ReviewList.validate_json(raw)
+            except ValidationError as e:
+                logger.warning(f"Discarding unreadable reviews for job {analysis_id}: {e}")
+        return []
+    
     async def set_result(
         self,
         analysis_id: str,
         result: InsightResult,
-        tokens_used: int = 0
+        tokens_used: int = 0,
+        updated_at: Optional[datetime] = None
     ) -> Optional[JobData]:
         """Store final analysis result."""
-        job = await self.get_job(analysis_id)
+        job = await self._patch_job(
+            analysis_id,
+            updated_at,
+            result=result.model_dump(mode="json"),
+            tokens_used=tokens_used,
+            status=JobStatus.COMPLETED,
+            progress=100
+        )
         if not job:
             return None
         
-        job.result = result
-        job.tokens_used = tokens_used
-        job.status = JobStatus.COMPLETED
-        job.progress = 100
-        job.updated_at = datetime.utcnow()
-        
-        await self.cache.set_json(
-            self._job_key(analysis_id),
-            job.model_dump(mode="json"),
-            ttl=self.settings.result_cache_ttl
-        )
-        
         logger.info(f"Job {analysis_id} completed (tokens: {tokens_used})")
         return job
     
+    async def get_result_by_hash(self, request_hash: str) -> Optional[InsightResult]:
+        """Get a previously computed result for an identical request."""
+        raw = await self.cache.get_raw(self._result_key(request_hash))
+        if raw:
+            try:
+                return InsightResult.model_validate_json(raw)
+            except ValidationError as e:
+                logger.warning(f"Discarding unreadable result {request_hash[:8]}: {e}")
+        return None
+    
+    async def set_result_by_hash(self, request_hash: str, result: InsightResult) -> None:
+        """Cache a result for identical requests, independent of any one job."""
+        await self.cache.set_raw(
+            self._result_key(request_hash),
+            result.model_dump_json(),
+            ttl=self.settings.result_cache_ttl
+        )
+    
     async def fail_job(
         self,
         analysis_id: str,
         error: str,
         error_code: ErrorCode
-    ) -> Optional[JobData]:
+    ) -> bool:
         """Mark job as failed."""
         return await self.update_status(
             analysis_id,
@@ -184,13 +357,7 @@ class JobManager:
         )
 
 
-# Global instance
-_job_manager: Optional[JobManager] = None
-
-
+@lru_cache(maxsize=1)
 def get_job_manager() -> JobManager:
     """Get job manager singleton."""
-    global _job_manager
-    if _job_manager is None:
-        _job_manager = JobManager()
-    return _job_manager
+    return JobManager()
@@ -0,0 +1,37 @@
+"""
+App Reviewer AI - Shared OpenAI Client
+
+Provides a process-wide AsyncOpenAI client so all pipelines share one connection pool.
+"""
+
+from openai import AsyncOpenAI
+from typing import Optional
+import logging
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Global OpenAI client
+_openai_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Get or create the shared OpenAI client."""
+    global _openai_client
+
+    if _openai_client is None:
+        # The SDK's own httpx pool keeps connections alive across calls
+        _openai_client = AsyncOpenAI(api_key=get_settings().openai_api_key)
+        logger.info("Created shared OpenAI client")
+
+    return _openai_client
+
+
+async def close_openai_client() -> None:
+    """Close the shared OpenAI client (call on application shutdown)."""
+    global _openai_client
+
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
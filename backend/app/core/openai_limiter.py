@@ -0,0 +1,119 @@
+"""
+App Reviewer AI - OpenAI Concurrency Limiter
+
+Caps in-flight OpenAI requests across all worker processes using a Redis
+sorted set. Without Redis (or if it errors) the same cap is applied per
+process with a semaphore.
+"""
+
+import asyncio
+import random
+import secrets
+import logging
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from app.config import get_settings
+from app.core.cache import CacheManager
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of in-flight request IDs scored by start time
+INFLIGHT_KEY = "openai:inflight"
+
+# Delay between acquire attempts while at capacity (seconds, before jitter)
+POLL_INTERVAL = 0.05
+
+# Take a slot if fewer than the cap are in flight.
+# KEYS[1] = set; ARGV[1] = window (seconds), ARGV[2] = cap, ARGV[3] = request ID.
+# Entries older than the window belong to crashed holders and are dropped first.
+# The server clock scores entries so process clock skew does not matter.
+_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local window = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    redis.call('EXPIRE', KEYS[1], window)
+    return 1
+end
+return 0
+"""
+
+_acquire_script = None
+
+# Per-process slots used when Redis is unavailable
+_local_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_local_slots(cap: int) -> asyncio.Semaphore:
+    """Get or create the per-process fallback semaphore."""
+    global _local_slots
+    
+    if _local_slots is None:
+        _local_slots = asyncio.Semaphore(cap)
+    return _local_slots
+
+
+class OpenAILimiter:
+    """Async context manager holding one global OpenAI request slot."""
+
+    def __init__(self, cache: CacheManager):
+        self.cache = cache
+        self.settings = get_settings()
+        self.request_id = secrets.token_hex(8)
+        self._redis = None
+        self._local: Optional[asyncio.Semaphore] = None
+
+    async def _acquire_local(self) -> "OpenAILimiter":
+        """Hold a slot of the per-process semaphore instead of the Redis set."""
+        slots = _get_local_slots(self.settings.openai_max_inflight)
+        await slots.acquire()
+        self._local = slots
+        return self
+
+    async def __aenter__(self) -> "OpenAILimiter":
+        global _acquire_script
+
+        redis_client = await self.cache.get_redis()
+        if redis_client is None:
+            return await self._acquire_local()
+
+        if _acquire_script is None:
+            _acquire_script = redis_client.register_script(_ACQUIRE_LUA)
+
+        args = [
+            self.settings.openai_inflight_window,
+            self.settings.openai_max_inflight,
+            self.request_id
+        ]
+
+        try:
+            while not await _acquire_script(keys=[INFLIGHT_KEY], args=args, client=redis_client):
+                await asyncio.sleep(POLL_INTERVAL * (1 + random.random()))
+        except RedisError as e:
+            # A Redis outage should not stop analysis; keep the cap per process
+            logger.warning(f"OpenAI limiter unavailable ({e}), using the per-process limit")
+            return await self._acquire_local()
+
+        self._redis = redis_client
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._local is not None:
+            self._local.release()
+            self._local = None
+            return
+
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.zrem(INFLIGHT_KEY, self.request_id)
+        except RedisError as e:
+            # The slot expires after openai_inflight_window anyway
+            logger.warning(f"Failed to release OpenAI limiter slot: {e}")
+        finally:
+            self._redis = None
@@ -0,0 +1,57 @@
+"""
+App Reviewer AI - Retry Helper
+
+Exponential backoff with jitter for outbound HTTP calls.
+"""
+
+import asyncio
+import random
+import logging
+from typing import Any, Awaitable, Callable, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _is_retriable(error: Exception) -> bool:
+    """Server errors and transport failures are retriable; 4xx responses are not."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+async def with_backoff(
+    fn: Callable[..., Awaitable[T]],
+    *args: Any,
+    max_attempts: int = 3,
+    base: float = 1.0,
+    cap: float = 10.0,
+    jitter: float = 0.5,
+    **kwargs: Any
+) -> T:
+    """
+    Await fn(*args, **kwargs), retrying recoverable failures.
+
+    Args:
+        fn: Coroutine function to call
+        max_attempts: Total number of attempts
+        base: Initial delay in seconds
+        cap: Maximum delay in seconds (before jitter)
+        jitter: Maximum extra delay as a fraction of the base delay
+
+    Returns:
+        Result of fn
+    """
+    for attempt in range(max_attempts):
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == max_attempts - 1 or not _is_retriable(e):
+                raise
+
+            delay = min(cap, base * 2 ** attempt) * (1 + random.uniform(0, jitter))
+            logger.warning(f"Attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
@@ -11,20 +11,63 @@ from typing import List
 from app.api.schemas import (
     JobStatus, ErrorCode, Review, InsightResult,
     SentimentBreakdown, TopIssue, FeatureRequest,
-    MonetizationRisk, RecommendedAction
+    MonetizationRisk, RecommendedAction, utc_now
 )
 from app.core.job_manager import get_job_manager
 from app.services.review_fetcher import ReviewFetcher
+from app.pipelines.base import TokenBudget, BudgetExceeded, ReviewChunk, prepare_chunks, get_pipeline
 from app.pipelines.sentiment import SentimentPipeline
 from app.pipelines.issues import IssuePipeline
 from app.pipelines.features import FeaturePipeline
 from app.pipelines.monetization import MonetizationPipeline
+from app.pipelines.fused import FusedPipeline
 from app.pipelines.actions import ActionPipeline
 from app.aggregation.aggregator import InsightAggregator
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Jobs from one batch processed at the same time
+BATCH_CONCURRENCY = 4
+
+
+async def run_review_pipelines(
+    review_texts: List[str],
+    chunks: List[ReviewChunk],
+    budget: TokenBudget
+) -> list:
+    """
+    Run sentiment, issue, feature and monetization analysis.
+    
+    By default each chunk gets one fused call covering all four; with
+    fused_pipelines off (or if no fused response is usable) the four
+    pipelines run in parallel.
+    
+    Returns:
+        Results in that order; failed pipelines appear as their exception
+    """
+    if get_settings().fused_pipelines:
+        try:
+            fused = await get_pipeline(FusedPipeline).analyze(
+                review_texts, prepared_chunks=chunks, budget=budget
+            )
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            logger.warning(f"Fused pipeline failed ({e}), running pipelines separately")
+            fused = None
+        
+        if fused is not None:
+            return [fused["sentiment"], fused["issues"], fused["features"], fused["monetization"]]
+    
+    return await asyncio.gather(
+        get_pipeline(SentimentPipeline).analyze(review_texts, prepared_chunks=chunks, budget=budget),
+        get_pipeline(IssuePipeline).analyze(review_texts, prepared_chunks=chunks, budget=budget),
+        get_pipeline(FeaturePipeline).analyze(review_texts, prepared_chunks=chunks, budget=budget),
+        get_pipeline(MonetizationPipeline).analyze(review_texts, prepared_chunks=chunks, budget=budget),
+        return_exceptions=True
+    )
+
 
 async def process_job(analysis_id: str) -> None:
     """
@@ -37,6 +80,9 @@ async def process_job(analysis_id: str) -> None:
     settings = get_settings()
     total_tokens = 0
     
+    # Shared by every pipeline so the job aborts as soon as the cap is crossed
+    budget = TokenBudget(settings.max_token_budget_per_job)
+    
     try:
         # Get job data
         job = await job_manager.get_job(analysis_id)
@@ -44,6 +90,13 @@ async def process_job(analysis_id: str) -> None:
             logger.error(f"Job not found: {analysis_id}")
             return
         
+        # Identical request already analysed: skip the pipelines entirely
+        cached_result = await job_manager.get_result_by_hash(job.request_hash)
+        if cached_result:
+            await job_manager.set_result(analysis_id, cached_result, 0)
+            logger.info(f"Job {analysis_id} served from result cache")
+            return
+        
         # ===== PHASE 1: FETCHING REVIEWS =====
         await job_manager.update_status(
             analysis_id, 
@@ -67,11 +120,13 @@ async def process_job(analysis_id: str) -> None:
             )
             return
         
-        await job_manager.set_reviews(analysis_id, reviews)
+        # Back-to-back ticks share one timestamp; long-running work gets a fresh one
+        phase_ts = utc_now()
         await job_manager.update_status(
             analysis_id, 
             JobStatus.FETCHING_REVIEWS, 
-            progress=20
+            progress=20,
+            updated_at=phase_ts
         )
         
         logger.info(f"Job {analysis_id}: Fetched {len(reviews)} reviews")
@@ -80,7 +135,8 @@ async def process_job(analysis_id: str) -> None:
         await job_manager.update_status(
             analysis_id, 
             JobStatus.ANALYZING_REVIEWS, 
-            progress=25
+            progress=25,
+            updated_at=phase_ts
         )
         
         # Check cost limits
@@ -92,22 +148,32 @@ async def process_job(analysis_id: str) -> None:
             )
             return
         
-        # Prepare review texts
+        # Persist reviews while the pipelines run; the LLM calls only need the texts
+        persist_task = asyncio.create_task(job_manager.set_reviews(analysis_id, reviews))
+        
+        # Prepare review texts, chunked and joined once for all pipelines
         review_texts = [r.body for r in reviews]
+        chunks = prepare_chunks(review_texts, token_budget=settings.chunk_token_budget)
         
-        # Run pipelines in parallel
-        sentiment_pipeline = SentimentPipeline()
-        issue_pipeline = IssuePipeline()
-        feature_pipeline = FeaturePipeline()
-        monetization_pipeline = MonetizationPipeline()
-        
-        pipeline_results = await asyncio.gather(
-            sentiment_pipeline.analyze(review_texts),
-            issue_pipeline.analyze(review_texts),
-            feature_pipeline.analyze(review_texts),
-            monetization_pipeline.analyze(review_texts),
-            return_exceptions=True
-        )
+        # Run pipelines (fused into one call for small jobs)
+        try:
+            pipeline_results = await run_review_pipelines(review_texts, chunks, budget)
+        finally:
+            # Stored reviews are not needed for the analysis, so a persistence
+            # failure is logged and never replaces the pipeline outcome
+            persisted, = await asyncio.gather(persist_task, return_exceptions=True)
+            if isinstance(persisted, Exception):
+                logger.error(f"Job {analysis_id}: failed to store reviews: {persisted}")
+        
+        # A blown budget is reported as a cost error, not a pipeline failure
+        for result in pipeline_results:
+            if isinstance(result, BudgetExceeded):
+                await job_manager.fail_job(
+                    analysis_id,
+                    str(result),
+                    ErrorCode.COST_LIMIT_EXCEEDED
+                )
+                return
         
         # Check for pipeline errors
         for i, result in enumerate(pipeline_results):
@@ -122,21 +188,6 @@ async def process_job(analysis_id: str) -> None:
         
         sentiment_result, issues_result, features_result, monetization_result = pipeline_results
         
-        # Track tokens
-        total_tokens += sentiment_pipeline.tokens_used
-        total_tokens += issue_pipeline.tokens_used
-        total_tokens += feature_pipeline.tokens_used
-        total_tokens += monetization_pipeline.tokens_used
-        
-        # Check token budget
-        if total_tokens > settings.max_token_budget_per_job:
-            await job_manager.fail_job(
-                analysis_id,
-                f"Token usage ({total_tokens}) exceeds budget ({settings.max_token_budget_per_job})",
-                ErrorCode.COST_LIMIT_EXCEEDED
-            )
-            return
-        
         await job_manager.update_status(
             analysis_id, 
             JobStatus.ANALYZING_REVIEWS, 
@@ -144,25 +195,29 @@ async def process_job(analysis_id: str) -> None:
         )
         
         # Run action pipeline (depends on other results)
-        action_pipeline = ActionPipeline()
+        action_pipeline = get_pipeline(ActionPipeline)
         actions_result = await action_pipeline.analyze(
             issues=issues_result,
             features=features_result,
-            monetization=monetization_result
+            monetization=monetization_result,
+            budget=budget
         )
-        total_tokens += action_pipeline.tokens_used
+        total_tokens = budget.used
         
+        phase_ts = utc_now()
         await job_manager.update_status(
             analysis_id, 
             JobStatus.ANALYZING_REVIEWS, 
-            progress=85
+            progress=85,
+            updated_at=phase_ts
         )
         
         # ===== PHASE 3: AGGREGATING RESULTS =====
         await job_manager.update_status(
             analysis_id, 
             JobStatus.AGGREGATING_RESULTS, 
-            progress=90
+            progress=90,
+            updated_at=phase_ts
         )
         
         # Aggregate all pipeline outputs
@@ -181,9 +236,18 @@ async def process_job(analysis_id: str) -> None:
         
         # ===== PHASE 4: COMPLETED =====
         await job_manager.set_result(analysis_id, result, total_tokens)
+        await job_manager.set_result_by_hash(job.request_hash, result)
         
         logger.info(f"Job {analysis_id} completed successfully. Tokens: {total_tokens}")
         
+    except BudgetExceeded as e:
+        logger.warning(f"Job {analysis_id} stopped: {e}")
+        await job_manager.fail_job(
+            analysis_id,
+            str(e),
+            ErrorCode.COST_LIMIT_EXCEEDED
+        )
+        
     except Exception as e:
         logger.exception(f"Job {analysis_id} failed with error: {e}")
         await job_manager.fail_job(
@@ -191,3 +255,14 @@ async def process_job(analysis_id: str) -> None:
             str(e),
             ErrorCode.SCHEMA_VALIDATION_FAILED
         )
+
+
+async def process_jobs(analysis_ids: List[str]) -> None:
+    """Process a batch of jobs, a few at a time (each job already fans out to four pipelines)."""
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def run(analysis_id: str) -> None:
+        async with semaphore:
+            await process_job(analysis_id)
+    
+    await asyncio.gather(*(run(analysis_id) for analysis_id in analysis_ids))
@@ -7,10 +7,14 @@ FastAPI application entry point with middleware and route configuration.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from app.api.routes import router
 from app.core.cache import get_redis_client
+from app.core.http_client import close_http_client
+from app.core.openai_client import close_openai_client
+from app.services.pdf_generator import start_pdf_pool, shutdown_pdf_pool
 from app.config import get_settings
 
 # Configure logging
@@ -30,6 +34,10 @@ async def lifespan(app: FastAPI):
     logger.info(f"OpenAI Model: {settings.openai_model}")
     logger.info(f"Supported Locales: {settings.locales_list}")
     
+    # uvloop when started via run.sh or `python -m app.main`; plain asyncio otherwise
+    loop = asyncio.get_running_loop()
+    logger.info(f"Event loop: {type(loop).__module__}.{type(loop).__name__}")
+    
     # Initialize Redis connection
     redis = await get_redis_client()
     if redis:
@@ -37,10 +45,15 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("Redis not available, using in-memory storage")
     
+    await start_pdf_pool()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down App Reviewer AI Backend...")
+    await shutdown_pdf_pool()
+    await close_http_client()
+    await close_openai_client()
     redis = await get_redis_client()
     if redis:
         await redis.close()
@@ -77,3 +90,18 @@ async def root():
         "version": "1.0.0",
         "docs": "/docs"
     }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    # `python -m app.main`: libuv event loop and the C HTTP parser
+    # (both ship with uvicorn[standard])
+    settings = get_settings()
+    uvicorn.run(
+        "app.main:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        loop="uvloop",
+        http="httptools"
+    )
@@ -4,10 +4,12 @@ App Reviewer AI - Action Recommendation Pipeline
 Converts insights into recommended actions.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from operator import itemgetter
+import heapq
 import logging
 
-from app.pipelines.base import BasePipeline
+from app.pipelines.base import BasePipeline, TokenBudget
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,9 @@ class ActionPipeline(BasePipeline):
     
     VERSION = "1.0"
     
+    # Sort rank per priority (unknown priorities sort last)
+    PRIORITY_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+    
     @property
     def name(self) -> str:
         return "actions"
@@ -97,7 +102,8 @@ RULES:
         self,
         issues: List[Dict[str, Any]],
         features: List[Dict[str, Any]],
-        monetization: Dict[str, Any]
+        monetization: Dict[str, Any],
+        budget: Optional[TokenBudget] = None
     ) -> List[Dict[str, Any]]:
         """
         Generate action recommendations from analysis results.
@@ -106,6 +112,7 @@ RULES:
             issues: List of issues from IssuePipeline
             features: List of features from FeaturePipeline
             monetization: Result from MonetizationPipeline
+            budget: Token budget of the job this call belongs to
             
         Returns:
             List of action recommendations
@@ -144,16 +151,14 @@ RULES:
         
         result = await self._call_openai(
             prompt,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            budget=budget
         )
         
         actions = result.get("actions", [])
         
-        # Sort by priority
-        priority_order = {"critical": 0, "high": 1, "medium": 2, "low": 3}
-        sorted_actions = sorted(
-            actions,
-            key=lambda x: priority_order.get(x.get("priority", "low"), 4)
-        )
+        # Top 10 actions by priority; rank each action once, selection is stable
+        ranked = [(self.PRIORITY_ORDER.get(a.get("priority", "low"), 4), a) for a in actions]
+        top = heapq.nsmallest(10, ranked, key=itemgetter(0))
         
-        return sorted_actions[:10]  # Top 10 actions
+        return [action for _, action in top]
@@ -5,15 +5,115 @@ Abstract base class for AI analysis pipelines with OpenAI integration.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-import json
+from functools import cached_property, lru_cache
+from typing import List, Dict, Any, Callable, Optional, NamedTuple, Type, TypeVar
+import asyncio
+import hashlib
 import logging
+import re
+import orjson
 from openai import AsyncOpenAI
 
 from app.config import get_settings
+from app.core.cache import get_cache_manager
+from app.core.openai_client import get_openai_client
+from app.core.openai_limiter import OpenAILimiter
 
 logger = logging.getLogger(__name__)
 
+# Predicate deciding whether a parsed response is usable (and worth caching)
+ResponseValidator = Callable[[Dict[str, Any]], bool]
+
+# Separator between reviews inside one prompt
+REVIEW_SEPARATOR = "\n---\n"
+
+# Rough characters per token for English text, for prompt sizing
+CHARS_PER_TOKEN = 4
+
+
+class ReviewChunk(NamedTuple):
+    """A batch of reviews joined into prompt text."""
+    size: int
+    text: str
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token count estimate (no tokenizer round trip)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def prepare_chunks(
+    reviews: List[str],
+    chunk_size: int = 50,
+    token_budget: Optional[int] = None
+) -> List[ReviewChunk]:
+    """
+    Split and join reviews into prompt-ready chunks.
+    
+    Computed once per job and shared by all pipelines, so each pipeline
+    does not re-slice and re-join the same texts.
+    
+    Chunks hold at most chunk_size reviews and, when token_budget is set,
+    roughly that many tokens of review text, so long reviews cannot push
+    a prompt into a truncated response. A single review over the budget
+    gets a chunk of its own.
+    """
+    if token_budget is None:
+        return [
+            ReviewChunk(len(chunk), REVIEW_SEPARATOR.join(chunk))
+            for chunk in (reviews[i:i + chunk_size] for i in range(0, len(reviews), chunk_size))
+        ]
+    
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    
+    for review in reviews:
+        tokens = estimate_tokens(review)
+        if current and (len(current) == chunk_size or current_tokens + tokens > token_budget):
+            chunks.append(ReviewChunk(len(current), REVIEW_SEPARATOR.join(current)))
+            current = []
+            current_tokens = 0
+        
+        current.append(review)
+        current_tokens += tokens
+    
+    if current:
+        chunks.append(ReviewChunk(len(current), REVIEW_SEPARATOR.join(current)))
+    
+    return chunks
+
+
+class BudgetExceeded(Exception):
+    """Raised when a job's shared token budget is used up."""
+    pass
+
+
+class TokenBudget:
+    """
+    Token budget shared by all pipelines of one job.
+    
+    Once exhausted, every further OpenAI call from any pipeline fails fast.
+    """
+    
+    def __init__(self, cap: int):
+        self.cap = cap
+        self.used = 0
+    
+    @property
+    def exceeded(self) -> bool:
+        return self.used > self.cap
+    
+    def check(self) -> None:
+        """Raise if the budget is already used up."""
+        if self.exceeded:
+            raise BudgetExceeded(f"Token usage ({self.used}) exceeds budget ({self.cap})")
+    
+    def charge(self, tokens: int) -> None:
+        """Record token usage, raising once the cap is crossed."""
+        self.used += tokens
+        self.check()
+
 
 class BasePipeline(ABC):
     """
@@ -24,6 +124,9 @@ class BasePipeline(ABC):
     - Enforce strict JSON output schema
     - Run with low temperature
     - Be independently executable
+    
+    Instances hold no per-job state, so one instance serves every job;
+    token accounting goes through the TokenBudget passed to each call.
     """
     
     # Pipeline version for tracking
@@ -33,10 +136,20 @@ class BasePipeline(ABC):
     TEMPERATURE = 0.1  # Low temperature for deterministic output
     MAX_TOKENS = 4000
     
+    # Cache key prefix for memoized OpenAI calls
+    LLM_CACHE_PREFIX = "llm:"
+    
+    # Fenced JSON block in free-form model output
+    _FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+    
     def __init__(self):
         self.settings = get_settings()
-        self.client = AsyncOpenAI(api_key=self.settings.openai_api_key)
-        self.tokens_used = 0
+        self.cache = get_cache_manager()
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Shared OpenAI client (one connection pool for all pipelines)."""
+        return get_openai_client()
     
     @property
     @abstractmethod
@@ -56,9 +169,30 @@ class BasePipeline(ABC):
         """JSON schema for output validation."""
         pass
     
-    def _chunk_reviews(self, reviews: List[str], chunk_size: int = 50) -> List[List[str]]:
-        """Split reviews into chunks for processing."""
-        return [reviews[i:i + chunk_size] for i in range(0, len(reviews), chunk_size)]
+    @cached_property
+    def _system_message(self) -> Dict[str, str]:
+        """System message, built once per pipeline instance."""
+        return {"role": "system", "content": self.system_prompt}
+    
+    @property
+    def prompt_cache_key(self) -> str:
+        """
+        Key grouping this pipeline's requests for OpenAI prompt caching.
+        
+        System prompts must stay fixed for a given VERSION so the cached
+        prefix matches; bump VERSION when editing a prompt.
+        """
+        return f"{self.name}-v{self.VERSION}"
+    
+    def _get_chunks(
+        self,
+        reviews: List[str],
+        prepared_chunks: Optional[List[ReviewChunk]] = None
+    ) -> List[ReviewChunk]:
+        """Use chunks prepared by the caller, or build them from the reviews."""
+        if prepared_chunks is not None:
+            return prepared_chunks
+        return prepare_chunks(reviews, token_budget=self.settings.chunk_token_budget)
     
     def _validate_output(self, output: Any, schema: Dict[str, Any]) -> bool:
         """
@@ -69,15 +203,68 @@ class BasePipeline(ABC):
             return False
         return True
     
+    @cached_property
+    def _llm_cache_hasher(self) -> "hashlib.blake2b":
+        """Hash state over the fixed part of every cache key (model, version, system prompt)."""
+        data = f"{self.settings.openai_model}|{self.VERSION}|{self.system_prompt}|"
+        return hashlib.blake2b(data.encode(), digest_size=16)
+    
+    def _llm_cache_key(self, user_prompt: str, response_format: Optional[Dict] = None) -> str:
+        """Cache key for one call: same model, prompts, format and version give the same output."""
+        fmt = response_format.get("type", "") if response_format else ""
+        # Only the per-call part is hashed here; the system prompt was hashed once
+        hasher = self._llm_cache_hasher.copy()
+        hasher.update(f"{fmt}|{user_prompt}".encode())
+        return f"{self.LLM_CACHE_PREFIX}{hasher.hexdigest()}"
+    
     async def _call_openai(
         self,
         user_prompt: str,
-        response_format: Optional[Dict] = None
+        response_format: Optional[Dict] = None,
+        budget: Optional[TokenBudget] = None,
+        validate: Optional[ResponseValidator] = None
+    ) -> Dict[str, Any]:
+        """
+        Make API call to OpenAI, memoized by prompt when enable_llm_cache is set.
+        
+        Only non-empty, parseable responses that pass `validate` (if given)
+        are cached, so a bad answer is retried instead of replayed.
+        """
+        if not self.settings.enable_llm_cache:
+            return await self._request_openai(user_prompt, response_format, budget)
+        
+        cache_key = self._llm_cache_key(user_prompt, response_format)
+        cached = await self.cache.get_json(cache_key)
+        if cached is not None and self._is_cacheable(cached, validate):
+            logger.debug(f"Pipeline {self.name}: LLM cache hit")
+            return cached
+        
+        result = await self._request_openai(user_prompt, response_format, budget)
+        
+        if self._is_cacheable(result, validate):
+            await self.cache.set_json(cache_key, result, ttl=self.settings.llm_cache_ttl)
+        return result
+    
+    @staticmethod
+    def _is_cacheable(result: Any, validate: Optional[ResponseValidator] = None) -> bool:
+        """Whether a response is worth replaying: non-empty, parsed, and usable."""
+        if not result or not isinstance(result, dict) or "raw" in result:
+            return False
+        return validate is None or validate(result)
+    
+    async def _request_openai(
+        self,
+        user_prompt: str,
+        response_format: Optional[Dict] = None,
+        budget: Optional[TokenBudget] = None
     ) -> Dict[str, Any]:
-        """Make API call to OpenAI."""
+        """Make API call to OpenAI, charging the job's token budget if given."""
+        if budget:
+            budget.check()
+        
         try:
             messages = [
-                {"role": "system", "content": self.system_prompt},
+                self._system_message,
                 {"role": "user", "content": user_prompt}
             ]
             
@@ -86,41 +273,104 @@ class BasePipeline(ABC):
                 "messages": messages,
                 "temperature": self.TEMPERATURE,
                 "max_tokens": self.MAX_TOKENS,
+                # Route identical system prefixes to the same prompt cache;
+                # sent as extra_body so older SDK versions accept it
+                "extra_body": {"prompt_cache_key": self.prompt_cache_key},
             }
             
             # Use JSON mode if available
             if response_format:
                 kwargs["response_format"] = response_format
             
-            response = await self.client.chat.completions.create(**kwargs)
+            # Hold a global in-flight slot so workers share the rate limit
+            async with OpenAILimiter(self.cache):
+                response = await self.client.chat.completions.create(**kwargs)
             
             # Track token usage
-            if response.usage:
-                self.tokens_used += response.usage.total_tokens
+            if response.usage and budget:
+                budget.charge(response.usage.total_tokens)
             
             # Parse response
             content = response.choices[0].message.content
             
+            if not content:
+                return {}
+            
             # Try to parse as JSON
             try:
-                # Find JSON in response
-                if "```json" in content:
-                    json_str = content.split("```json")[1].split("```")[0]
-                elif "```" in content:
-                    json_str = content.split("```")[1].split("```")[0]
-                else:
-                    json_str = content
+                # JSON mode returns bare JSON; otherwise strip a code fence if present
+                if response_format and response_format.get("type") == "json_object":
+                    return orjson.loads(content)
+                
+                match = self._FENCE_RE.search(content)
+                json_str = match.group(1) if match else content
                 
-                return json.loads(json_str.strip())
-            except json.JSONDecodeError:
+                return orjson.loads(json_str.strip())
+            except orjson.JSONDecodeError:
                 logger.warning(f"Failed to parse JSON from pipeline {self.name}")
                 return {"raw": content}
                 
+        except BudgetExceeded:
+            raise
         except Exception as e:
             logger.error(f"OpenAI API error in pipeline {self.name}: {e}")
             raise
     
+    async def _gather_chunks(
+        self,
+        prompts: List[str],
+        response_format: Optional[Dict] = None,
+        budget: Optional[TokenBudget] = None,
+        validate: Optional[ResponseValidator] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run one OpenAI call per prompt concurrently.
+        
+        Concurrency is capped by the max_parallel_chunks setting. Failed
+        chunks are logged and skipped while they stay within the
+        max_failed_chunk_ratio setting; beyond that, the first error is
+        raised so a result is never built from a small share of the
+        reviews. Running out of token budget always raises.
+        `validate` is handed to _call_openai to decide what gets cached.
+        
+        Returns:
+            Parsed results of the successful calls, in prompt order
+        """
+        semaphore = asyncio.Semaphore(self.settings.max_parallel_chunks)
+        
+        async def call(prompt: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._call_openai(
+                    prompt,
+                    response_format=response_format,
+                    budget=budget,
+                    validate=validate
+                )
+        
+        results = await asyncio.gather(*(call(p) for p in prompts), return_exceptions=True)
+        
+        for r in results:
+            if isinstance(r, BudgetExceeded):
+                raise r
+        
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            logger.warning(f"Pipeline {self.name}: {len(errors)}/{len(results)} chunks failed")
+            if len(errors) > len(results) * self.settings.max_failed_chunk_ratio:
+                raise errors[0]
+        
+        return [r for r in results if not isinstance(r, BaseException)]
+    
     @abstractmethod
     async def analyze(self, *args, **kwargs) -> Any:
         """Run the analysis pipeline."""
         pass
+
+
+P = TypeVar("P", bound=BasePipeline)
+
+
+@lru_cache(maxsize=None)
+def get_pipeline(pipeline_cls: Type[P]) -> P:
+    """Get the shared instance of a pipeline class."""
+    return pipeline_cls()
@@ -4,10 +4,12 @@ App Reviewer AI - Feature Request Detection Pipeline
 Separates complaints from feature requests.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from collections import Counter
+import heapq
 import logging
 
-from app.pipelines.base import BasePipeline
+from app.pipelines.base import BasePipeline, ReviewChunk, TokenBudget
 
 logger = logging.getLogger(__name__)
 
@@ -76,12 +78,19 @@ RULES:
             }
         }
     
-    async def analyze(self, reviews: List[str]) -> List[Dict[str, Any]]:
+    async def analyze(
+        self,
+        reviews: List[str],
+        prepared_chunks: Optional[List[ReviewChunk]] = None,
+        budget: Optional[TokenBudget] = None
+    ) -> List[Dict[str, Any]]:
         """
         Extract feature requests from reviews.
         
         Args:
             reviews: List of review texts
+            prepared_chunks: Pre-joined chunks of `reviews` (see prepare_chunks)
+            budget: Token budget of the job this call belongs to
             
         Returns:
             List of feature request objects
@@ -90,42 +99,42 @@ RULES:
             return []
         
         # Process in chunks
-        chunks = self._chunk_reviews(reviews)
-        all_features = []
+        chunks = self._get_chunks(reviews, prepared_chunks)
+        prompts = [
+            f"Extract feature requests from these {chunk.size} app reviews:\n\n{chunk.text}"
+            for chunk in chunks
+        ]
         
-        for chunk in chunks:
-            reviews_text = "\n---\n".join(chunk)
-            prompt = f"Extract feature requests from these {len(chunk)} app reviews:\n\n{reviews_text}"
-            
-            result = await self._call_openai(
-                prompt,
-                response_format={"type": "json_object"}
-            )
-            
-            features = result.get("features", [])
-            all_features.extend(features)
+        results = await self._gather_chunks(
+            prompts,
+            response_format={"type": "json_object"},
+            budget=budget
+        )
+        
+        return self.merge_results(results)
+    
+    def merge_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Combine per-chunk feature lists, deduplicated and ranked."""
+        all_features = []
+        for result in results:
+            all_features.extend(result.get("features", []))
         
-        # Aggregate and deduplicate
-        feature_map = {}
+        # Aggregate and deduplicate: counts per normalised name, first-seen payload
+        counts: Counter = Counter()
+        meta: Dict[str, Dict[str, Any]] = {}
         for feature in all_features:
-            name = feature.get("feature", "").lower().strip()
+            label = feature.get("feature", "")
+            name = label.lower().strip()
             if not name:
                 continue
             
-            if name in feature_map:
-                feature_map[name]["count"] += feature.get("count", 1)
-            else:
-                feature_map[name] = {
-                    "feature": feature.get("feature", name),
-                    "count": feature.get("count", 1),
-                    "category": feature.get("category", "other")
-                }
-        
-        # Sort by count
-        sorted_features = sorted(
-            feature_map.values(),
-            key=lambda x: x["count"],
-            reverse=True
-        )
+            counts[name] += feature.get("count", 1)
+            if name not in meta:
+                meta[name] = {"feature": label, "category": feature.get("category", "other")}
         
-        return sorted_features[:15]  # Top 15 feature requests
+        # Top 15 feature requests by count
+        top = heapq.nlargest(15, counts.items(), key=lambda kv: kv[1])
+        return [
+            {"feature": meta[name]["feature"], "count": count, "category": meta[name]["category"]}
+            for name, count in top
+        ]
@@ -0,0 +1,202 @@
+"""
+App Reviewer AI - Fused Review Pipeline
+
+Runs sentiment, issue, feature and monetization analysis in one LLM call
+per chunk, so each review is sent to the model once instead of four times.
+"""
+
+from typing import List, Dict, Any, Optional
+import logging
+
+from app.pipelines.base import (
+    BasePipeline, ReviewChunk, TokenBudget, REVIEW_SEPARATOR, estimate_tokens, get_pipeline
+)
+from app.pipelines.sentiment import SentimentPipeline
+from app.pipelines.issues import IssuePipeline
+from app.pipelines.features import FeaturePipeline
+from app.pipelines.monetization import MonetizationPipeline
+
+logger = logging.getLogger(__name__)
+
+# Result sections and the pipeline whose merge rules normalise each one
+SECTIONS = {
+    "sentiment": SentimentPipeline,
+    "issues": IssuePipeline,
+    "features": FeaturePipeline,
+    "monetization": MonetizationPipeline,
+}
+
+
+class FusedPipeline(BasePipeline):
+    """
+    Combined review analysis pipeline.
+    
+    Saves three round trips and three copies of the review text per chunk
+    compared to running the four review pipelines separately. Adjacent
+    chunks are combined into one prompt while they stay within both
+    fused_pipeline_threshold reviews and chunk_token_budget tokens.
+    
+    Output:
+    {
+        "sentiment": <SentimentPipeline output>,
+        "issues": <IssuePipeline output>,
+        "features": <FeaturePipeline output>,
+        "monetization": <MonetizationPipeline output>
+    }
+    """
+    
+    VERSION = "1.0"
+    
+    @property
+    def name(self) -> str:
+        return "fused"
+    
+    @property
+    def system_prompt(self) -> str:
+        return """You are an app review analysis system.
+
+TASK:
+Analyze the provided app reviews in four ways at once:
+1. sentiment: classify sentiment and emotional tones
+2. issues: extract technical issues, bugs, and UX problems
+3. features: identify requests for new features (not complaints about existing ones)
+4. monetization: identify monetization-related complaints and revenue risks
+   (subscriptions, paywalls, pricing, ads, refunds, value perception)
+
+OUTPUT FORMAT (strict JSON):
+{
+    "sentiment": {
+        "overall_sentiment": "positive" | "neutral" | "negative",
+        "sentiment_breakdown": {
+            "positive": <percentage 0-100>,
+            "neutral": <percentage 0-100>,
+            "negative": <percentage 0-100>
+        },
+        "emotions": [
+            {
+                "emotion": "<emotion name>",
+                "frequency": <0.0-1.0 indicating how common>
+            }
+        ]
+    },
+    "issues": {
+        "issues": [
+            {
+                "issue": "<clear description of the issue>",
+                "frequency": <estimated count across reviews>,
+                "severity": "low" | "medium" | "high",
+                "category": "<bug|crash|performance|ux|content|other>"
+            }
+        ]
+    },
+    "features": {
+        "features": [
+            {
+                "feature": "<clear description of requested feature>",
+                "count": <estimated number of requests>,
+                "category": "ui" | "functionality" | "integration" | "content" | "accessibility" | "other"
+            }
+        ]
+    },
+    "monetization": {
+        "overall_risk": "low" | "medium" | "high",
+        "risks": [
+            {
+                "risk": "<clear description of monetization issue>",
+                "confidence": "low" | "medium" | "high",
+                "category": "subscription" | "pricing" | "paywall" | "ads" | "value" | "other",
+                "impact": "<potential business impact>"
+            }
+        ]
+    }
+}
+
+RULES:
+1. Sentiment percentages must sum to 100
+2. Detect emotions: frustration, confusion, satisfaction, excitement, disappointment, anger, appreciation
+3. Issue severity: high=crashes/data loss, medium=broken features, low=minor annoyances
+4. Keep issues and feature requests apart; group similar entries together
+5. Monetization confidence is based on frequency and clarity
+6. Be specific, concise, objective and data-driven
+7. Only output valid JSON, no explanations"""
+    
+    @property
+    def output_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                section: get_pipeline(pipeline_cls).output_schema
+                for section, pipeline_cls in SECTIONS.items()
+            }
+        }
+    
+    @staticmethod
+    def _is_usable(result: Dict[str, Any]) -> bool:
+        """Whether a response has every section (partial answers are neither used nor cached)."""
+        return all(isinstance(result.get(section), dict) for section in SECTIONS)
+    
+    def _merge_chunks(self, chunks: List[ReviewChunk]) -> List[ReviewChunk]:
+        """Combine adjacent chunks that fit the review and token limits together."""
+        max_reviews = self.settings.fused_pipeline_threshold
+        token_budget = self.settings.chunk_token_budget
+        
+        merged: List[ReviewChunk] = []
+        for chunk in chunks:
+            if merged:
+                last = merged[-1]
+                text = last.text + REVIEW_SEPARATOR + chunk.text
+                if last.size + chunk.size <= max_reviews and estimate_tokens(text) <= token_budget:
+                    merged[-1] = ReviewChunk(last.size + chunk.size, text)
+                    continue
+            merged.append(chunk)
+        
+        return merged
+    
+    async def analyze(
+        self,
+        reviews: List[str],
+        prepared_chunks: Optional[List[ReviewChunk]] = None,
+        budget: Optional[TokenBudget] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run all four review analyses with one call per chunk.
+        
+        Args:
+            reviews: List of review texts
+            prepared_chunks: Pre-joined chunks of `reviews` (see prepare_chunks)
+            budget: Token budget of the job this call belongs to
+        
+        Returns:
+            Results keyed by section, each shaped like its own pipeline's
+            output; None if no response was usable
+        """
+        if not reviews:
+            return None
+        
+        chunks = self._merge_chunks(self._get_chunks(reviews, prepared_chunks))
+        
+        prompts = [
+            f"Analyze these {chunk.size} app reviews:\n\n{chunk.text}"
+            for chunk in chunks
+        ]
+        
+        results = await self._gather_chunks(
+            prompts,
+            response_format={"type": "json_object"},
+            budget=budget,
+            validate=self._is_usable
+        )
+        
+        usable = [result for result in results if self._is_usable(result)]
+        if len(usable) < len(results):
+            logger.warning(
+                f"Pipeline {self.name}: {len(results) - len(usable)}/{len(results)} responses missing sections"
+            )
+        if not usable:
+            return None
+        
+        # Same deduplication, ranking and caps as the separate pipelines
+        return {
+            section: get_pipeline(pipeline_cls).merge_results([result[section] for result in usable])
+            for section, pipeline_cls in SECTIONS.items()
+        }
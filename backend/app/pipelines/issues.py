@@ -4,13 +4,18 @@ App Reviewer AI - Issue & Bug Extraction Pipeline
 Identifies recurring technical or UX problems.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from operator import itemgetter
+import heapq
 import logging
 
-from app.pipelines.base import BasePipeline
+from app.pipelines.base import BasePipeline, ReviewChunk, TokenBudget
 
 logger = logging.getLogger(__name__)
 
+# Numeric weight per severity (unknown values count as low)
+_SEVERITY_LEVELS = {"low": 1, "medium": 2, "high": 3}
+
 
 class IssuePipeline(BasePipeline):
     """
@@ -78,12 +83,19 @@ RULES:
             }
         }
     
-    async def analyze(self, reviews: List[str]) -> List[Dict[str, Any]]:
+    async def analyze(
+        self,
+        reviews: List[str],
+        prepared_chunks: Optional[List[ReviewChunk]] = None,
+        budget: Optional[TokenBudget] = None
+    ) -> List[Dict[str, Any]]:
         """
         Extract issues from reviews.
         
         Args:
             reviews: List of review texts
+            prepared_chunks: Pre-joined chunks of `reviews` (see prepare_chunks)
+            budget: Token budget of the job this call belongs to
             
         Returns:
             List of issue objects
@@ -92,23 +104,29 @@ RULES:
             return []
         
         # Process in chunks
-        chunks = self._chunk_reviews(reviews)
-        all_issues = []
+        chunks = self._get_chunks(reviews, prepared_chunks)
+        prompts = [
+            f"Extract issues and bugs from these {chunk.size} app reviews:\n\n{chunk.text}"
+            for chunk in chunks
+        ]
         
-        for chunk in chunks:
-            reviews_text = "\n---\n".join(chunk)
-            prompt = f"Extract issues and bugs from these {len(chunk)} app reviews:\n\n{reviews_text}"
-            
-            result = await self._call_openai(
-                prompt,
-                response_format={"type": "json_object"}
-            )
-            
-            issues = result.get("issues", [])
-            all_issues.extend(issues)
+        all_results = await self._gather_chunks(
+            prompts,
+            response_format={"type": "json_object"},
+            budget=budget
+        )
         
-        # Aggregate and deduplicate issues
+        return self.merge_results(all_results)
+    
+    def merge_results(self, all_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Combine per-chunk issue lists, deduplicated and ranked."""
+        all_issues = []
+        for result in all_results:
+            all_issues.extend(result.get("issues", []))
+        
+        # Aggregate and deduplicate issues, tracking each one's severity level
         issue_map = {}
+        levels = {}
         for issue in all_issues:
             name = issue.get("issue", "").lower().strip()
             if not name:
@@ -117,26 +135,27 @@ RULES:
             if name in issue_map:
                 # Merge: add frequency, keep highest severity
                 issue_map[name]["frequency"] += issue.get("frequency", 1)
-                if self._severity_level(issue.get("severity", "low")) > \
-                   self._severity_level(issue_map[name]["severity"]):
-                    issue_map[name]["severity"] = issue.get("severity", "low")
+                severity = issue.get("severity", "low")
+                level = self._severity_level(severity)
+                if level > levels[name]:
+                    issue_map[name]["severity"] = severity
+                    levels[name] = level
             else:
+                severity = issue.get("severity", "medium")
                 issue_map[name] = {
                     "issue": issue.get("issue", name),
                     "frequency": issue.get("frequency", 1),
-                    "severity": issue.get("severity", "medium"),
+                    "severity": severity,
                     "category": issue.get("category", "other")
                 }
+                levels[name] = self._severity_level(severity)
         
-        # Sort by frequency and severity
-        sorted_issues = sorted(
-            issue_map.values(),
-            key=lambda x: (x["frequency"] * self._severity_level(x["severity"])),
-            reverse=True
-        )
+        # Top 20 issues by frequency weighted by severity (scored once each)
+        scored = [(entry["frequency"] * levels[name], entry) for name, entry in issue_map.items()]
+        top = heapq.nlargest(20, scored, key=itemgetter(0))
         
-        return sorted_issues[:20]  # Top 20 issues
+        return [entry for _, entry in top]
     
     def _severity_level(self, severity: str) -> int:
         """Convert severity to numeric level."""
-        return {"low": 1, "medium": 2, "high": 3}.get(severity, 1)
+        return _SEVERITY_LEVELS.get(severity, 1)
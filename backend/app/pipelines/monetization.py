@@ -4,13 +4,18 @@ App Reviewer AI - Monetization Friction Pipeline
 Detects revenue-blocking feedback.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from operator import itemgetter
+import heapq
 import logging
 
-from app.pipelines.base import BasePipeline
+from app.pipelines.base import BasePipeline, ReviewChunk, TokenBudget
 
 logger = logging.getLogger(__name__)
 
+# Numeric weight per risk/confidence level (unknown values count as low)
+_RISK_LEVELS = {"low": 1, "medium": 2, "high": 3}
+
 
 class MonetizationPipeline(BasePipeline):
     """
@@ -96,12 +101,19 @@ RULES:
             }
         }
     
-    async def analyze(self, reviews: List[str]) -> Dict[str, Any]:
+    async def analyze(
+        self,
+        reviews: List[str],
+        prepared_chunks: Optional[List[ReviewChunk]] = None,
+        budget: Optional[TokenBudget] = None
+    ) -> Dict[str, Any]:
         """
         Analyze monetization friction in reviews.
         
         Args:
             reviews: List of review texts
+            prepared_chunks: Pre-joined chunks of `reviews` (see prepare_chunks)
+            budget: Token budget of the job this call belongs to
             
         Returns:
             Monetization risk analysis
@@ -113,27 +125,31 @@ RULES:
             }
         
         # Process in chunks
-        chunks = self._chunk_reviews(reviews)
+        chunks = self._get_chunks(reviews, prepared_chunks)
+        prompts = [
+            f"Analyze monetization friction in these {chunk.size} app reviews:\n\n{chunk.text}"
+            for chunk in chunks
+        ]
+        
+        all_results = await self._gather_chunks(
+            prompts,
+            response_format={"type": "json_object"},
+            budget=budget
+        )
+        
+        return self.merge_results(all_results)
+    
+    def merge_results(self, all_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-chunk monetization results into one."""
         all_risks = []
         risk_levels = []
+        for result in all_results:
+            all_risks.extend(result.get("risks", []))
+            risk_levels.append(self._risk_level(result.get("overall_risk", "low")))
         
-        for chunk in chunks:
-            reviews_text = "\n---\n".join(chunk)
-            prompt = f"Analyze monetization friction in these {len(chunk)} app reviews:\n\n{reviews_text}"
-            
-            result = await self._call_openai(
-                prompt,
-                response_format={"type": "json_object"}
-            )
-            
-            risks = result.get("risks", [])
-            all_risks.extend(risks)
-            
-            overall = result.get("overall_risk", "low")
-            risk_levels.append(self._risk_level(overall))
-        
-        # Aggregate risks
+        # Aggregate risks, tracking each one's confidence level
         risk_map = {}
+        levels = {}
         for risk in all_risks:
             name = risk.get("risk", "").lower().strip()
             if not name:
@@ -141,16 +157,20 @@ RULES:
             
             if name in risk_map:
                 # Keep higher confidence
-                if self._risk_level(risk.get("confidence", "low")) > \
-                   self._risk_level(risk_map[name]["confidence"]):
-                    risk_map[name]["confidence"] = risk.get("confidence", "low")
+                confidence = risk.get("confidence", "low")
+                level = self._risk_level(confidence)
+                if level > levels[name]:
+                    risk_map[name]["confidence"] = confidence
+                    levels[name] = level
             else:
+                confidence = risk.get("confidence", "medium")
                 risk_map[name] = {
                     "risk": risk.get("risk", name),
-                    "confidence": risk.get("confidence", "medium"),
+                    "confidence": confidence,
                     "category": risk.get("category", "other"),
                     "impact": risk.get("impact", "")
                 }
+                levels[name] = self._risk_level(confidence)
         
         # Calculate overall risk
         avg_risk = sum(risk_levels) / len(risk_levels) if risk_levels else 1
@@ -161,18 +181,15 @@ RULES:
         else:
             overall_risk = "low"
         
-        # Sort by confidence
-        sorted_risks = sorted(
-            risk_map.values(),
-            key=lambda x: self._risk_level(x["confidence"]),
-            reverse=True
-        )
+        # Top 10 risks by confidence (scored once each)
+        scored = [(levels[name], entry) for name, entry in risk_map.items()]
+        top = heapq.nlargest(10, scored, key=itemgetter(0))
         
         return {
             "overall_risk": overall_risk,
-            "risks": sorted_risks[:10]  # Top 10 risks
+            "risks": [entry for _, entry in top]
         }
     
     def _risk_level(self, level: str) -> int:
         """Convert risk/confidence level to numeric."""
-        return {"low": 1, "medium": 2, "high": 3}.get(level, 1)
+        return _RISK_LEVELS.get(level, 1)
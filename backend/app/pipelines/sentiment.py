@@ -4,10 +4,11 @@ App Reviewer AI - Sentiment & Emotion Pipeline
 Detects emotional tone beyond star ratings.
 """
 
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Optional
 import logging
 
-from app.pipelines.base import BasePipeline
+from app.pipelines.base import BasePipeline, ReviewChunk, TokenBudget
 
 logger = logging.getLogger(__name__)
 
@@ -94,12 +95,19 @@ RULES:
             }
         }
     
-    async def analyze(self, reviews: List[str]) -> Dict[str, Any]:
+    async def analyze(
+        self,
+        reviews: List[str],
+        prepared_chunks: Optional[List[ReviewChunk]] = None,
+        budget: Optional[TokenBudget] = None
+    ) -> Dict[str, Any]:
         """
         Analyze sentiment and emotions in reviews.
         
         Args:
             reviews: List of review texts
+            prepared_chunks: Pre-joined chunks of `reviews` (see prepare_chunks)
+            budget: Token budget of the job this call belongs to
             
         Returns:
             Sentiment analysis result
@@ -112,43 +120,46 @@ RULES:
             }
         
         # Process in chunks for large datasets
-        chunks = self._chunk_reviews(reviews)
-        all_results = []
+        chunks = self._get_chunks(reviews, prepared_chunks)
+        prompts = [
+            f"Analyze the sentiment and emotions in these {chunk.size} app reviews:\n\n{chunk.text}"
+            for chunk in chunks
+        ]
         
-        for chunk in chunks:
-            reviews_text = "\n---\n".join(chunk)
-            prompt = f"Analyze the sentiment and emotions in these {len(chunk)} app reviews:\n\n{reviews_text}"
-            
-            result = await self._call_openai(
-                prompt,
-                response_format={"type": "json_object"}
-            )
-            all_results.append(result)
+        all_results = await self._gather_chunks(
+            prompts,
+            response_format={"type": "json_object"},
+            budget=budget
+        )
         
+        return self.merge_results(all_results)
+    
+    def merge_results(self, all_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-chunk sentiment results into one."""
         # Aggregate results if multiple chunks
         if len(all_results) == 1:
             return all_results[0]
         
-        # Merge sentiment breakdowns
-        total_positive = sum(r.get("sentiment_breakdown", {}).get("positive", 0) for r in all_results)
-        total_neutral = sum(r.get("sentiment_breakdown", {}).get("neutral", 0) for r in all_results)
-        total_negative = sum(r.get("sentiment_breakdown", {}).get("negative", 0) for r in all_results)
-        
-        count = len(all_results)
-        
-        # Merge emotions
-        emotion_freq = {}
+        # Merge sentiment breakdowns and emotions in one pass
+        total_positive = total_neutral = total_negative = 0
+        emotion_freq = Counter()
         for result in all_results:
+            breakdown = result.get("sentiment_breakdown", {})
+            total_positive += breakdown.get("positive", 0)
+            total_neutral += breakdown.get("neutral", 0)
+            total_negative += breakdown.get("negative", 0)
+            
             for emotion in result.get("emotions", []):
                 name = emotion.get("emotion", "")
-                freq = emotion.get("frequency", 0)
                 if name:
-                    emotion_freq[name] = emotion_freq.get(name, 0) + freq
+                    emotion_freq[name] += emotion.get("frequency", 0)
+        
+        count = len(all_results)
         
-        # Normalize emotion frequencies
+        # Normalize frequencies of the top 10 emotions
         emotions = [
             {"emotion": name, "frequency": round(freq / count, 2)}
-            for name, freq in sorted(emotion_freq.items(), key=lambda x: -x[1])
+            for name, freq in emotion_freq.most_common(10)
         ]
         
         # Determine overall sentiment
@@ -169,5 +180,5 @@ RULES:
                 "neutral": round(total_neutral / count, 1),
                 "negative": round(total_negative / count, 1)
             },
-            "emotions": emotions[:10]  # Top 10 emotions
+            "emotions": emotions
         }
@@ -6,7 +6,12 @@ Generates PDF reports from insight results.
 
 from io import BytesIO
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from xml.sax.saxutils import escape
+import asyncio
 import logging
+import os
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -19,6 +24,7 @@ from reportlab.platypus import (
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
 from app.api.schemas import InsightResult
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +35,191 @@ SECONDARY_COLOR = HexColor("#64748B")
 SUCCESS_COLOR = HexColor("#22C55E")
 WARNING_COLOR = HexColor("#F59E0B")
 DANGER_COLOR = HexColor("#EF4444")
+WHITE = HexColor("#FFFFFF")
+
+
+# Paragraph and table styles, built once per process and shared by all reports
+_STYLES = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    textColor=PRIMARY_COLOR,
+    spaceAfter=20,
+    alignment=TA_CENTER
+)
+
+HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_STYLES['Heading2'],
+    fontSize=16,
+    textColor=PRIMARY_COLOR,
+    spaceBefore=20,
+    spaceAfter=10
+)
+
+SUBHEADING_STYLE = ParagraphStyle(
+    'CustomSubheading',
+    parent=_STYLES['Heading3'],
+    fontSize=12,
+    textColor=SECONDARY_COLOR,
+    spaceBefore=10,
+    spaceAfter=5
+)
+
+BODY_STYLE = ParagraphStyle(
+    'CustomBody',
+    parent=_STYLES['Normal'],
+    fontSize=10,
+    spaceAfter=8,
+    leading=14
+)
+
+DATE_STYLE = ParagraphStyle('Date', parent=BODY_STYLE, alignment=TA_CENTER, textColor=SECONDARY_COLOR)
+FOOTER_STYLE = ParagraphStyle('Footer', parent=BODY_STYLE, alignment=TA_CENTER, textColor=SECONDARY_COLOR)
+CELL_STYLE = ParagraphStyle('Cell', parent=BODY_STYLE, fontSize=9, leading=12, spaceAfter=0)
+CELL_NOTE_STYLE = ParagraphStyle('CellNote', parent=CELL_STYLE, textColor=SECONDARY_COLOR)
+
+INFO_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('TEXTCOLOR', (0, 0), (0, -1), SECONDARY_COLOR),
+    ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+])
+
+SENTIMENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 0.5, SECONDARY_COLOR),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+])
+
+ISSUES_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 0.5, SECONDARY_COLOR),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+])
+
+FEATURES_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 0.5, SECONDARY_COLOR),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+])
+
+RISKS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), WARNING_COLOR),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 0.5, SECONDARY_COLOR),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+])
+
+ACTIONS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LINEBELOW', (0, 1), (-1, -1), 0.5, SECONDARY_COLOR),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+])
+
+# Accent color per action priority
+PRIORITY_COLORS = {
+    "high": DANGER_COLOR,
+    "medium": WARNING_COLOR,
+    "low": SUCCESS_COLOR
+}
+
+
+def _pool_size() -> int:
+    """Number of render processes (pdf_workers, or one per CPU if set to 0)."""
+    return get_settings().pdf_workers or os.cpu_count() or 1
+
+
+# Global render pool
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Get or create the process pool used for PDF rendering."""
+    global _pdf_pool
+    
+    if _pdf_pool is None:
+        workers = _pool_size()
+        _pdf_pool = ProcessPoolExecutor(max_workers=workers)
+        logger.info(f"Started PDF render pool with {workers} workers")
+    
+    return _pdf_pool
+
+
+def _worker_ready() -> int:
+    """No-op task; unpickling it imports this module (ReportLab, styles) in the worker."""
+    return os.getpid()
+
+
+async def start_pdf_pool() -> None:
+    """
+    Create the render pool and warm its workers (call on application startup).
+    
+    Spawning processes and importing ReportLab then happens before the
+    first export instead of inside it.
+    """
+    pool = get_pdf_pool()
+    loop = asyncio.get_running_loop()
+    pids = await asyncio.gather(*(
+        loop.run_in_executor(pool, _worker_ready) for _ in range(_pool_size())
+    ))
+    logger.info(f"PDF render pool warmed ({len(set(pids))} processes)")
+
+
+async def shutdown_pdf_pool() -> None:
+    """
+    Shut down the PDF render pool (call on application shutdown).
+    
+    Queued renders are cancelled; waiting for running ones and the
+    worker processes happens in a thread, off the event loop.
+    """
+    global _pdf_pool
+    
+    if _pdf_pool is not None:
+        pool, _pdf_pool = _pdf_pool, None
+        await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+
+async def render_pdf_report(result: InsightResult) -> bytes:
+    """
+    Generate a PDF report in the render pool without blocking the event loop.
+    
+    Args:
+        result: InsightResult object
+        
+    Returns:
+        PDF file as bytes
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pdf_pool(), generate_pdf_report, result)
 
 
 def generate_pdf_report(result: InsightResult) -> bytes:
@@ -51,53 +242,14 @@ def generate_pdf_report(result: InsightResult) -> bytes:
         bottomMargin=0.75*inch
     )
     
-    # Get styles
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=PRIMARY_COLOR,
-        spaceAfter=20,
-        alignment=TA_CENTER
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=PRIMARY_COLOR,
-        spaceBefore=20,
-        spaceAfter=10
-    )
-    
-    subheading_style = ParagraphStyle(
-        'CustomSubheading',
-        parent=styles['Heading3'],
-        fontSize=12,
-        textColor=SECONDARY_COLOR,
-        spaceBefore=10,
-        spaceAfter=5
-    )
-    
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=8,
-        leading=14
-    )
-    
     # Build content
     story = []
     
     # Title
-    story.append(Paragraph("App Review Analysis Report", title_style))
+    story.append(Paragraph("App Review Analysis Report", TITLE_STYLE))
     story.append(Paragraph(
         f"Generated: {result.generated_at.strftime('%Y-%m-%d %H:%M UTC')}",
-        ParagraphStyle('Date', parent=body_style, alignment=TA_CENTER, textColor=SECONDARY_COLOR)
+        DATE_STYLE
     ))
     story.append(Spacer(1, 0.25*inch))
     
@@ -113,24 +265,17 @@ def generate_pdf_report(result: InsightResult) -> bytes:
     ]
     
     info_table = Table(info_data, colWidths=[1.5*inch, 4*inch])
-    info_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), SECONDARY_COLOR),
-        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    info_table.setStyle(INFO_TABLE_STYLE)
     story.append(info_table)
     story.append(Spacer(1, 0.25*inch))
     
     # Executive Summary
-    story.append(Paragraph("Executive Summary", heading_style))
-    story.append(Paragraph(result.summary, body_style))
+    story.append(Paragraph("Executive Summary", HEADING_STYLE))
+    story.append(Paragraph(result.summary, BODY_STYLE))
     story.append(Spacer(1, 0.2*inch))
     
     # Sentiment Breakdown
-    story.append(Paragraph("Sentiment Analysis", heading_style))
+    story.append(Paragraph("Sentiment Analysis", HEADING_STYLE))
     
     sentiment_data = [
         ["Sentiment", "Percentage"],
@@ -140,22 +285,13 @@ def generate_pdf_report(result: InsightResult) -> bytes:
     ]
     
     sentiment_table = Table(sentiment_data, colWidths=[2*inch, 2*inch])
-    sentiment_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
-        ('TEXTCOLOR', (0, 0), (-1, 0), HexColor("#FFFFFF")),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, SECONDARY_COLOR),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-    ]))
+    sentiment_table.setStyle(SENTIMENT_TABLE_STYLE)
     story.append(sentiment_table)
     story.append(Spacer(1, 0.2*inch))
     
     # Top Issues
     if result.top_issues:
-        story.append(Paragraph("Top Issues", heading_style))
+        story.append(Paragraph("Top Issues", HEADING_STYLE))
         
         issues_data = [["Issue", "Frequency", "Severity"]]
         for issue in result.top_issues[:10]:
@@ -166,22 +302,13 @@ def generate_pdf_report(result: InsightResult) -> bytes:
             ])
         
         issues_table = Table(issues_data, colWidths=[3.5*inch, 1*inch, 1*inch])
-        issues_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
-            ('TEXTCOLOR', (0, 0), (-1, 0), HexColor("#FFFFFF")),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 0.5, SECONDARY_COLOR),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        issues_table.setStyle(ISSUES_TABLE_STYLE)
         story.append(issues_table)
         story.append(Spacer(1, 0.2*inch))
     
     # Feature Requests
     if result.feature_requests:
-        story.append(Paragraph("Feature Requests", heading_style))
+        story.append(Paragraph("Feature Requests", HEADING_STYLE))
         
         features_data = [["Feature", "Request Count"]]
         for feature in result.feature_requests[:10]:
@@ -191,22 +318,13 @@ def generate_pdf_report(result: InsightResult) -> bytes:
             ])
         
         features_table = Table(features_data, colWidths=[4.5*inch, 1*inch])
-        features_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
-            ('TEXTCOLOR', (0, 0), (-1, 0), HexColor("#FFFFFF")),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 0.5, SECONDARY_COLOR),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        features_table.setStyle(FEATURES_TABLE_STYLE)
         story.append(features_table)
         story.append(Spacer(1, 0.2*inch))
     
     # Monetization Risks
     if result.monetization_risks:
-        story.append(Paragraph("Monetization Risks", heading_style))
+        story.append(Paragraph("Monetization Risks", HEADING_STYLE))
         
         risks_data = [["Risk", "Confidence"]]
         for risk in result.monetization_risks:
@@ -216,48 +334,41 @@ def generate_pdf_report(result: InsightResult) -> bytes:
             ])
         
         risks_table = Table(risks_data, colWidths=[4.5*inch, 1*inch])
-        risks_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), WARNING_COLOR),
-            ('TEXTCOLOR', (0, 0), (-1, 0), HexColor("#FFFFFF")),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 0.5, SECONDARY_COLOR),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        risks_table.setStyle(RISKS_TABLE_STYLE)
         story.append(risks_table)
         story.append(Spacer(1, 0.2*inch))
     
     # Recommended Actions
     if result.recommended_actions:
         story.append(PageBreak())
-        story.append(Paragraph("Recommended Actions", heading_style))
+        story.append(Paragraph("Recommended Actions", HEADING_STYLE))
         
+        # One table instead of two paragraphs and a spacer per action;
+        # each row gets a bar in its priority color. Generated text is
+        # escaped since cells are Paragraph markup.
+        actions_data = [["Priority", "Action", "Expected Impact"]]
+        priority_bars = []
         for i, action in enumerate(result.recommended_actions[:10], 1):
-            priority_color = {
-                "high": DANGER_COLOR,
-                "medium": WARNING_COLOR,
-                "low": SUCCESS_COLOR
-            }.get(action.priority.value, SECONDARY_COLOR)
+            priority_color = PRIORITY_COLORS.get(action.priority.value, SECONDARY_COLOR)
+            priority_bars.append(('LINEBEFORE', (0, i), (0, i), 3, priority_color))
             
-            story.append(Paragraph(
-                f"<b>{i}. [{action.priority.value.upper()}]</b> {action.action}",
-                body_style
-            ))
-            if action.expected_impact:
-                story.append(Paragraph(
-                    f"<i>Expected Impact: {action.expected_impact}</i>",
-                    ParagraphStyle('Impact', parent=body_style, textColor=SECONDARY_COLOR, leftIndent=20)
-                ))
-            story.append(Spacer(1, 0.1*inch))
+            actions_data.append([
+                Paragraph(f"<b>{i}. {action.priority.value.upper()}</b>", CELL_STYLE),
+                Paragraph(escape(action.action), CELL_STYLE),
+                Paragraph(f"<i>{escape(action.expected_impact)}</i>" if action.expected_impact else "", CELL_NOTE_STYLE)
+            ])
+        
+        actions_table = Table(actions_data, colWidths=[1.1*inch, 3.4*inch, 2*inch], repeatRows=1)
+        actions_table.setStyle(ACTIONS_TABLE_STYLE)
+        actions_table.setStyle(priority_bars)
+        story.append(actions_table)
     
     # Footer
     story.append(Spacer(1, 0.5*inch))
     story.append(HRFlowable(width="100%", thickness=1, color=SECONDARY_COLOR))
     story.append(Paragraph(
         "Generated by App Reviewer AI",
-        ParagraphStyle('Footer', parent=body_style, alignment=TA_CENTER, textColor=SECONDARY_COLOR)
+        FOOTER_STYLE
     ))
     
     # Build PDF
@@ -4,12 +4,16 @@ App Reviewer AI - Review Fetcher Service
 Orchestrates review fetching across multiple adapters.
 """
 
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
+from collections import OrderedDict
+import asyncio
 import logging
 import re
 from datetime import datetime
 
-from app.api.schemas import Review
+from pydantic import ValidationError
+
+from app.api.schemas import Review, ReviewList
 from app.adapters.appstore import AppStoreAdapter
 from app.adapters.playstore import PlayStoreAdapter
 from app.core.cache import get_cache_manager
@@ -17,6 +21,22 @@ from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Script detection patterns, compiled once
+_CJK_RE = re.compile(r'[\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]')
+_CYRILLIC_RE = re.compile(r'[\u0400-\u04ff]')
+
+# CJK, Cyrillic or Arabic (\u0600-\u06ff); most reviews match none, so they
+# are scanned only once
+_NON_LATIN_RE = re.compile(r'[\u0400-\u04ff\u0600-\u06ff\u3040-\u30ff\u4e00-\u9fff\uac00-\ud7af]')
+
+# Lone surrogates (from badly decoded input) cannot be encoded as UTF-8 later
+_SURROGATE_RE = re.compile(r'[\ud800-\udfff]')
+
+# Review lists already validated from the cache, keyed by cache key and
+# reused while the cached payload is unchanged (most recently used last)
+DECODED_CACHE_SIZE = 32
+_decoded_reviews: "OrderedDict[str, Tuple[Any, List[Review]]]" = OrderedDict()
+
 
 class ReviewFetcher:
     """
@@ -35,66 +55,97 @@ class ReviewFetcher:
         """Generate cache key for reviews."""
         return f"{self.CACHE_PREFIX}{app_id}:{locale}"
     
+    def _decode_cached(self, cache_key: str, raw: Any) -> Optional[List[Review]]:
+        """
+        Validate a cached review list, or reuse this process's last result.
+        
+        A payload equal to the one validated before is not parsed again;
+        comparing the raw values is far cheaper than Pydantic validation.
+        """
+        entry = _decoded_reviews.get(cache_key)
+        if entry is not None and entry[0] == raw:
+            _decoded_reviews.move_to_end(cache_key)
+            return entry[1]
+        
+        try:
+            reviews = ReviewList.validate_json(raw)
+        except ValidationError as e:
+            logger.warning(f"Ignoring unreadable review cache {cache_key}: {e}")
+            return None
+        
+        _decoded_reviews[cache_key] = (raw, reviews)
+        _decoded_reviews.move_to_end(cache_key)
+        if len(_decoded_reviews) > DECODED_CACHE_SIZE:
+            _decoded_reviews.popitem(last=False)
+        return reviews
+    
     def _clean_text(self, text: str) -> str:
         """Clean and normalize review text."""
         if not text:
             return ""
         
-        # Remove excessive whitespace
+        # Remove excessive whitespace (also trims both ends)
         text = " ".join(text.split())
         
-        # Normalize unicode
-        text = text.encode("utf-8", errors="ignore").decode("utf-8")
+        # Drop lone surrogates; valid text is returned without re-encoding
+        if not text.isascii() and _SURROGATE_RE.search(text):
+            text = text.encode("utf-8", errors="ignore").decode("utf-8")
         
-        return text.strip()
+        return text
     
     def _detect_language(self, text: str) -> str:
         """
         Simple language detection based on character analysis.
         For production, consider using langdetect or fasttext.
         """
-        if not text:
+        # isascii() reads a flag on the string object, so ASCII text costs no scan
+        if not text or text.isascii():
+            return "en"
+        
+        match = _NON_LATIN_RE.search(text)
+        if not match:
             return "en"
         
+        # Nothing before the first match belongs to any script, so resume there
+        start = match.start()
+        
         # Check for CJK characters
-        cjk_pattern = re.compile(r'[\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]')
-        if cjk_pattern.search(text):
+        if _CJK_RE.search(text, start):
             return "cjk"
         
         # Check for Cyrillic
-        cyrillic_pattern = re.compile(r'[\u0400-\u04ff]')
-        if cyrillic_pattern.search(text):
+        if _CYRILLIC_RE.search(text, start):
             return "ru"
         
-        # Check for Arabic
-        arabic_pattern = re.compile(r'[\u0600-\u06ff]')
-        if arabic_pattern.search(text):
-            return "ar"
-        
-        return "en"
+        # Neither CJK nor Cyrillic, so the match was Arabic
+        return "ar"
     
     def _process_reviews(self, reviews: List[Review]) -> List[Review]:
         """Clean and process fetched reviews."""
+        # Skip duplicate IDs, keeping the first review seen for each; fallback
+        # IDs can repeat across pages for different reviews
+        unique = {}
+        for review in reviews:
+            unique.setdefault(review.review_id, review)
+        
+        clean_text = self._clean_text
+        detect_language = self._detect_language
         processed = []
-        seen_ids = set()
         
-        for review in reviews:
-            # Skip duplicates
-            if review.review_id in seen_ids:
+        for review in unique.values():
+            # Clean text
+            body = clean_text(review.body)
+            
+            # Skip empty reviews
+            if not body:
                 continue
-            seen_ids.add(review.review_id)
             
-            # Clean text
-            review.body_cleaned = self._clean_text(review.body)
+            review.body_cleaned = body
             if review.title:
-                review.title = self._clean_text(review.title)
+                review.title = clean_text(review.title)
             
             # Detect language
-            review.detected_language = self._detect_language(review.body_cleaned)
-            
-            # Skip empty reviews
-            if not review.body_cleaned:
-                continue
+            review.detected_language = detect_language(body)
             
             processed.append(review)
         
@@ -121,12 +172,15 @@ class ReviewFetcher:
         """
         cache_key = self._cache_key(app_id, locale)
         
-        # Check cache
-        cached = await self.cache.get_json(cache_key)
+        # Check cache (validated straight from JSON, no intermediate dicts)
+        cached = await self.cache.get_raw(cache_key)
         if cached:
-            logger.info(f"Using cached reviews for {app_id}")
-            reviews = [Review(**r) for r in cached]
-            return reviews[:limit]
+            reviews = self._decode_cached(cache_key, cached)
+            if reviews is not None:
+                logger.info(f"Using cached reviews for {app_id}")
+                # The decoded list is shared across calls; hand out copies
+                # so callers' changes cannot leak into other jobs
+                return [review.model_copy() for review in reviews[:limit]]
         
         # Select adapter
         if platform == "ios":
@@ -151,12 +205,33 @@ class ReviewFetcher:
         # Process reviews
         processed = self._process_reviews(reviews)
         
-        # Cache results
-        await self.cache.set_json(
+        # Cache results (unset optional fields are left out and default back on load)
+        await self.cache.set_raw(
             cache_key,
-            [r.model_dump(mode="json") for r in processed],
+            ReviewList.dump_json(processed, exclude_none=True),
             ttl=self.settings.review_cache_ttl
         )
         
         logger.info(f"Fetched and cached {len(processed)} reviews for {app_id}")
         return processed[:limit]
+    
+    async def fetch_both(
+        self,
+        ios_app_id: str,
+        android_app_id: str,
+        locale: str = "en-US",
+        limit: int = 500
+    ) -> Tuple[List[Review], List[Review]]:
+        """
+        Fetch reviews for an app from both stores concurrently.
+        
+        Each platform goes through fetch_reviews, so each is cached on its own.
+        
+        Returns:
+            (iOS reviews, Android reviews)
+        """
+        ios_reviews, android_reviews = await asyncio.gather(
+            self.fetch_reviews(ios_app_id, "ios", locale, limit),
+            self.fetch_reviews(android_app_id, "android", locale, limit)
+        )
+        return ios_reviews, android_reviews
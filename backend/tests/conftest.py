@@ -0,0 +1,22 @@
+"""Shared test fixtures."""
+
+import os
+
+# Settings require an API key; tests never reach OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest
+
+from app.core import cache
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    """A CacheManager running on a fresh in-memory backend (no Redis)."""
+    async def no_redis():
+        return None
+    
+    backend = cache.InMemoryCache()
+    monkeypatch.setattr(cache, "_memory_cache", backend)
+    monkeypatch.setattr(cache, "get_redis_client", no_redis)
+    return cache.CacheManager()
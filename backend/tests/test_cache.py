@@ -0,0 +1,97 @@
+"""Tests for the cache layer on the in-memory backend."""
+
+import orjson
+import pytest
+
+from app.core import cache
+
+
+@pytest.mark.asyncio
+async def test_patch_json_merges_fields(memory_cache):
+    await memory_cache.set_json("job:1", {"status": "created", "progress": 0, "reviews": []})
+    
+    raw = await memory_cache.patch_json("job:1", {"progress": 20, "error": None})
+    
+    expected = {"status": "created", "progress": 20, "reviews": [], "error": None}
+    assert orjson.loads(raw) == expected
+    assert await memory_cache.get_json("job:1") == expected
+
+
+@pytest.mark.asyncio
+async def test_patch_json_missing_key(memory_cache):
+    assert await memory_cache.patch_json("job:missing", {"progress": 20}) is None
+    assert await memory_cache.get_raw("job:missing") is None
+
+
+@pytest.mark.asyncio
+async def test_patch_json_keeps_ttl(memory_cache):
+    await memory_cache.set_json("job:1", {"progress": 0}, ttl=100)
+    
+    await memory_cache.patch_json("job:1", {"progress": 20})
+    
+    assert 0 < await cache._memory_cache.ttl("job:1") <= 100
+
+
+@pytest.mark.asyncio
+async def test_patch_json_resets_ttl(memory_cache):
+    await memory_cache.set_json("job:1", {"progress": 0}, ttl=100)
+    
+    await memory_cache.patch_json("job:1", {"progress": 20}, ttl=5000)
+    
+    assert 100 < await cache._memory_cache.ttl("job:1") <= 5000
+
+
+@pytest.mark.asyncio
+async def test_expired_keys_read_as_missing(memory_cache, monkeypatch):
+    await memory_cache.set_json("llm:1", {"x": 1}, ttl=10)
+    
+    now = cache.time.monotonic()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now + 11)
+    
+    assert await memory_cache.get_json("llm:1") is None
+    assert await memory_cache.find_keys("llm:*") == []
+    assert await memory_cache.set_json_nx("llm:1", {"x": 2})
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_refresh_does_not_evict(monkeypatch):
+    calls = []
+    
+    class Source:
+        @cache.async_method_ttl_cache(ttl=10, maxsize=3)
+        async def lookup(self, key):
+            calls.append(key)
+            return key
+    
+    source = Source()
+    now = cache.time.monotonic()
+    
+    def at(offset):
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now + offset)
+    
+    at(0)
+    await source.lookup("a")
+    at(5)
+    await source.lookup("b")
+    at(11)
+    await source.lookup("a")  # expired, refreshed until 21
+    at(12)
+    await source.lookup("c")
+    
+    # Refreshing "b" while full must not evict the still-valid "a"
+    at(16)
+    await source.lookup("b")
+    at(17)
+    await source.lookup("a")
+    assert calls == ["a", "b", "a", "c", "b"]
+
+
+@pytest.mark.asyncio
+async def test_compare_and_set(memory_cache):
+    assert await memory_cache.compare_and_set("hash:1", None, b"a", ttl=100)
+    assert not await memory_cache.compare_and_set("hash:1", None, b"b")
+    
+    raw = await memory_cache.get_raw("hash:1")
+    assert await memory_cache.compare_and_set("hash:1", raw, b"c", ttl=100)
+    assert not await memory_cache.compare_and_set("hash:1", raw, b"d")
+    assert await memory_cache.get_raw("hash:1") == b"c"
@@ -0,0 +1,57 @@
+"""Tests for job creation and request deduplication."""
+
+import asyncio
+
+import pytest
+
+from app.api.schemas import AnalysisOptions, ErrorCode, Platform
+from app.core.job_manager import JobManager
+
+
+@pytest.fixture
+def job_manager(memory_cache):
+    manager = JobManager()
+    manager.cache = memory_cache
+    return manager
+
+
+async def create(manager: JobManager, analysis_id: str):
+    return await manager.create_job(
+        analysis_id=analysis_id,
+        app_url="https://apps.apple.com/app/id123",
+        app_id="123",
+        platform=Platform.IOS,
+        options=AnalysisOptions(),
+        request_hash="hash-1"
+    )
+
+
+@pytest.mark.asyncio
+async def test_identical_request_joins_running_job(job_manager):
+    first = await create(job_manager, "a")
+    second = await create(job_manager, "b")
+    
+    assert second.analysis_id == first.analysis_id == "a"
+    assert await job_manager.get_job("b") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_takeover_of_failed_holder_has_one_winner(job_manager, monkeypatch):
+    await create(job_manager, "dead")
+    await job_manager.fail_job("dead", "boom", ErrorCode.AI_TIMEOUT)
+    
+    # Yield while looking up the holder so both requests see the failed job
+    get_job = job_manager.get_job
+    
+    async def slow_get_job(analysis_id):
+        await asyncio.sleep(0)
+        return await get_job(analysis_id)
+    
+    monkeypatch.setattr(job_manager, "get_job", slow_get_job)
+    
+    jobs = await asyncio.gather(create(job_manager, "a"), create(job_manager, "b"))
+    
+    winner = jobs[0].analysis_id
+    assert jobs[1].analysis_id == winner
+    holder = await job_manager.get_by_hash("hash-1")
+    assert holder.analysis_id == winner
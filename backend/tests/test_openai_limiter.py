@@ -0,0 +1,49 @@
+"""Tests for the OpenAI in-flight limiter on the in-memory backend."""
+
+import asyncio
+
+import pytest
+
+from app.config import get_settings
+from app.core import openai_limiter
+from app.core.openai_limiter import OpenAILimiter
+
+
+@pytest.fixture
+def limiter_cap(monkeypatch):
+    """Cap in-flight calls at 3 with fresh per-process slots."""
+    monkeypatch.setattr(get_settings(), "openai_max_inflight", 3)
+    monkeypatch.setattr(openai_limiter, "_local_slots", None)
+    return 3
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_inflight_calls(memory_cache, limiter_cap):
+    inflight = 0
+    peak = 0
+    
+    async def call():
+        nonlocal inflight, peak
+        async with OpenAILimiter(memory_cache):
+            inflight += 1
+            peak = max(peak, inflight)
+            await asyncio.sleep(0.01)
+            inflight -= 1
+    
+    await asyncio.gather(*(call() for _ in range(10)))
+    
+    assert peak == limiter_cap
+
+
+@pytest.mark.asyncio
+async def test_limiter_releases_slot_on_error(memory_cache, limiter_cap):
+    for _ in range(limiter_cap):
+        with pytest.raises(RuntimeError):
+            async with OpenAILimiter(memory_cache):
+                raise RuntimeError("request failed")
+    
+    # Every slot was returned, so a full set of callers is admitted at once
+    limiters = [OpenAILimiter(memory_cache) for _ in range(limiter_cap)]
+    await asyncio.wait_for(asyncio.gather(*(limiter.__aenter__() for limiter in limiters)), timeout=1)
+    for limiter in limiters:
+        await limiter.__aexit__(None, None, None)
@@ -0,0 +1,98 @@
+"""Tests for shared pipeline behaviour (LLM memoization, chunk fan-out)."""
+
+import pytest
+
+from app.pipelines.fused import FusedPipeline, SECTIONS
+from app.pipelines.issues import IssuePipeline
+
+
+@pytest.fixture
+def pipeline(memory_cache, monkeypatch):
+    """An IssuePipeline on the in-memory cache whose OpenAI responses are scripted."""
+    pipeline = IssuePipeline()
+    pipeline.cache = memory_cache
+    pipeline.responses = []
+    pipeline.requests = 0
+    
+    async def request_openai(user_prompt, response_format=None, budget=None):
+        pipeline.requests += 1
+        response = pipeline.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    
+    monkeypatch.setattr(pipeline.settings, "enable_llm_cache", True)
+    monkeypatch.setattr(pipeline, "_request_openai", request_openai)
+    return pipeline
+
+
+@pytest.mark.asyncio
+async def test_usable_response_is_memoized(pipeline):
+    pipeline.responses = [{"issues": []}]
+    
+    assert await pipeline._call_openai("reviews") == {"issues": []}
+    assert await pipeline._call_openai("reviews") == {"issues": []}
+    assert pipeline.requests == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("response", [{}, {"raw": "not json"}])
+async def test_empty_or_unparsed_response_is_not_memoized(pipeline, response):
+    pipeline.responses = [response, {"issues": []}]
+    
+    assert await pipeline._call_openai("reviews") == response
+    assert await pipeline._call_openai("reviews") == {"issues": []}
+    assert pipeline.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_response_is_not_memoized(pipeline):
+    pipeline.responses = [{"other": 1}, {"issues": []}]
+    
+    def has_issues(result):
+        return "issues" in result
+    
+    assert await pipeline._call_openai("reviews", validate=has_issues) == {"other": 1}
+    assert await pipeline._call_openai("reviews", validate=has_issues) == {"issues": []}
+    assert await pipeline._call_openai("reviews", validate=has_issues) == {"issues": []}
+    assert pipeline.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_fused_response_missing_a_section_is_not_memoized(memory_cache, monkeypatch):
+    fused = FusedPipeline()
+    fused.cache = memory_cache
+    complete = {section: {} for section in SECTIONS}
+    partial = {section: {} for section in list(SECTIONS)[:-1]}
+    responses = [partial, complete]
+    
+    async def request_openai(user_prompt, response_format=None, budget=None):
+        return responses.pop(0)
+    
+    monkeypatch.setattr(fused.settings, "enable_llm_cache", True)
+    monkeypatch.setattr(fused, "_request_openai", request_openai)
+    
+    assert await fused.analyze(["Crashes on launch"]) is None
+    assert await fused.analyze(["Crashes on launch"]) is not None
+    assert not responses
+
+
+@pytest.mark.asyncio
+async def test_gather_chunks_tolerates_failures_within_ratio(pipeline, monkeypatch):
+    monkeypatch.setattr(pipeline.settings, "max_failed_chunk_ratio", 0.2)
+    monkeypatch.setattr(pipeline.settings, "max_parallel_chunks", 1)
+    pipeline.responses = [RuntimeError("timeout")] + [{"issues": []}] * 4
+    
+    results = await pipeline._gather_chunks([f"chunk {i}" for i in range(5)])
+    
+    assert results == [{"issues": []}] * 4
+
+
+@pytest.mark.asyncio
+async def test_gather_chunks_fails_beyond_ratio(pipeline, monkeypatch):
+    monkeypatch.setattr(pipeline.settings, "max_failed_chunk_ratio", 0.2)
+    monkeypatch.setattr(pipeline.settings, "max_parallel_chunks", 1)
+    pipeline.responses = [RuntimeError("timeout")] * 2 + [{"issues": []}] * 3
+    
+    with pytest.raises(RuntimeError):
+        await pipeline._gather_chunks([f"chunk {i}" for i in range(5)])
@@ -0,0 +1,60 @@
+"""Tests for Play Store app validation."""
+
+import httpx
+import pytest
+
+from app.adapters.playstore import PlayStoreAdapter
+from app.core import retry
+
+
+def _status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://play.google.com/store/apps/details")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError(f"{status_code}", request=request, response=response)
+
+
+@pytest.fixture
+def no_backoff_delay(monkeypatch):
+    async def no_sleep(delay):
+        pass
+    
+    monkeypatch.setattr(retry.asyncio, "sleep", no_sleep)
+
+
+@pytest.mark.asyncio
+async def test_unavailable_store_is_not_memoized(monkeypatch, no_backoff_delay):
+    adapter = PlayStoreAdapter()
+    calls = 0
+    
+    async def get(url, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls <= 3:
+            raise _status_error(503)
+        return httpx.Response(200)
+    
+    monkeypatch.setattr(adapter, "_get", get)
+    
+    # Every retry fails: validation fails, but the outcome is not cached
+    assert await adapter.validate_app_id("com.example.flaky") is False
+    assert calls == 3
+    
+    assert await adapter.validate_app_id("com.example.flaky") is True
+    assert calls == 4
+
+
+@pytest.mark.asyncio
+async def test_missing_app_is_memoized(monkeypatch):
+    adapter = PlayStoreAdapter()
+    calls = 0
+    
+    async def get(url, **kwargs):
+        nonlocal calls
+        calls += 1
+        raise _status_error(404)
+    
+    monkeypatch.setattr(adapter, "_get", get)
+    
+    assert await adapter.validate_app_id("com.example.missing") is False
+    assert await adapter.validate_app_id("com.example.missing") is False
+    assert calls == 1
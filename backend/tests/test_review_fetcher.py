@@ -0,0 +1,52 @@
+"""Tests for review processing and the review cache."""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import pytest
+
+from app.api.schemas import Review, ReviewList
+from app.services import review_fetcher
+from app.services.review_fetcher import ReviewFetcher
+
+
+def make_review(review_id: str, body: str) -> Review:
+    return Review(
+        review_id=review_id,
+        rating=4,
+        date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        locale="en-US",
+        body=body
+    )
+
+
+def test_process_reviews_keeps_first_duplicate():
+    reviews = [
+        make_review("unknown_0", "First page review"),
+        make_review("1", "Another review"),
+        make_review("unknown_0", "Second page review"),
+    ]
+    
+    processed = ReviewFetcher()._process_reviews(reviews)
+    
+    assert [r.body for r in processed] == ["First page review", "Another review"]
+
+
+@pytest.mark.asyncio
+async def test_cached_fetches_do_not_share_instances(memory_cache, monkeypatch):
+    monkeypatch.setattr(review_fetcher, "_decoded_reviews", OrderedDict())
+    fetcher = ReviewFetcher()
+    fetcher.cache = memory_cache
+    
+    reviews = [make_review("1", "Great app"), make_review("2", "Keeps crashing")]
+    await memory_cache.set_raw(fetcher._cache_key("123", "en-US"), ReviewList.dump_json(reviews))
+    
+    first = await fetcher.fetch_reviews("123", locale="en-US")
+    second = await fetcher.fetch_reviews("123", locale="en-US")
+    
+    assert first == second
+    assert all(a is not b for a, b in zip(first, second))
+    
+    first[0].body_cleaned = "changed"
+    third = await fetcher.fetch_reviews("123", locale="en-US")
+    assert third[0].body_cleaned is None
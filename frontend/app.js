@@ -73,7 +73,7 @@ async function fetchReviews() {
 
     try {
         const response = await fetch(
-            `${API_BASE}/fetch-reviews?app_url=${encodeURIComponent(appUrl)}&locale=${locale}&limit=${limit}`,
+            `${API_BASE}/fetch-reviews?app_url=${encodeURIComponent(appUrl)}&locale=${locale}&limit=${limit}&include_reviews=true`,
             { method: 'POST' }
         );
 
@@ -32,7 +32,7 @@ pip install -r requirements.txt
 # Start Backend in the background
 echo -e "${GREEN}🚀 Starting Backend API (Port 8000)...${NC}"
 # Run uvicorn in background
-uvicorn app.main:app --reload --port 8000 &
+uvicorn app.main:app --reload --port 8000 --loop uvloop --http httptools &
 BACKEND_PID=$!
 
 # 2. Wait for backend to be ready